@@ -0,0 +1,52 @@
+-- Non-destructive upgrade for databases created from an earlier schema.sql.
+-- Every statement is idempotent; scripts/migrations.py applies this file
+-- before each ingest run, so it only ever adds what is missing.
+
+-- Price Gaps Table: Missing trading sessions inside each symbol's history (see scripts/gap_index.py)
+CREATE TABLE IF NOT EXISTS price_gaps (
+    symbol VARCHAR(10) NOT NULL,
+    gap_start DATE NOT NULL,
+    gap_end DATE NOT NULL,
+    missing_sessions INTEGER NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    detected_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_attempt_at TIMESTAMP,
+    PRIMARY KEY (symbol, gap_start)
+);
+
+-- Prices Quarantine Table: Ingested rows that failed quality checks (see scripts/data_quality.py)
+CREATE TABLE IF NOT EXISTS prices_quarantine (
+    id SERIAL PRIMARY KEY,
+    symbol VARCHAR(10) NOT NULL,
+    price_date DATE NOT NULL,
+    open_price DECIMAL(18,2),
+    high_price DECIMAL(18,2),
+    low_price DECIMAL(18,2),
+    close_price DECIMAL(18,2),
+    volume BIGINT,
+    reasons TEXT[] NOT NULL,
+    source VARCHAR(20) NOT NULL,
+    quarantined_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Same name as the constraint schema.sql creates, so this is a no-op there
+CREATE UNIQUE INDEX IF NOT EXISTS prices_quarantine_symbol_price_date_reasons_key
+    ON prices_quarantine(symbol, price_date, reasons);
+
+-- Data Quality Stats Table: Per-symbol counters updated incrementally by every ingest batch
+CREATE TABLE IF NOT EXISTS data_quality_stats (
+    symbol VARCHAR(10) PRIMARY KEY,
+    accepted_rows BIGINT NOT NULL DEFAULT 0,
+    duplicate_rows BIGINT NOT NULL DEFAULT 0,
+    rejected_rows BIGINT NOT NULL DEFAULT 0,
+    null_price BIGINT NOT NULL DEFAULT 0,
+    non_positive_price BIGINT NOT NULL DEFAULT 0,
+    ohlc_inconsistent BIGINT NOT NULL DEFAULT 0,
+    zero_volume BIGINT NOT NULL DEFAULT 0,
+    future_date BIGINT NOT NULL DEFAULT 0,
+    outlier_return BIGINT NOT NULL DEFAULT 0,
+    first_date DATE,
+    last_date DATE,
+    last_close DECIMAL(18,2),
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
@@ -1,6 +1,9 @@
 -- Drop tables if they exist (for development/testing)
 DROP TABLE IF EXISTS prices;
 DROP TABLE IF EXISTS volumes;
+DROP TABLE IF EXISTS price_gaps;
+DROP TABLE IF EXISTS prices_quarantine;
+DROP TABLE IF EXISTS data_quality_stats;
 
 -- Prices Table: Stores daily OHLCV data for assets
 CREATE TABLE prices (
@@ -19,3 +22,49 @@ CREATE TABLE prices (
 -- Indexes for performance
 CREATE INDEX idx_prices_symbol_date ON prices(symbol, price_date);
 CREATE INDEX idx_prices_date ON prices(price_date);
+
+-- Price Gaps Table: Missing trading sessions inside each symbol's history (see scripts/gap_index.py)
+CREATE TABLE price_gaps (
+    symbol VARCHAR(10) NOT NULL,
+    gap_start DATE NOT NULL,
+    gap_end DATE NOT NULL,
+    missing_sessions INTEGER NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0, -- Provider requests that failed to fill the gap
+    detected_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_attempt_at TIMESTAMP,
+    PRIMARY KEY (symbol, gap_start)
+);
+
+-- Prices Quarantine Table: Ingested rows that failed quality checks (see scripts/data_quality.py)
+CREATE TABLE prices_quarantine (
+    id SERIAL PRIMARY KEY,
+    symbol VARCHAR(10) NOT NULL,
+    price_date DATE NOT NULL,
+    open_price DECIMAL(18,2),
+    high_price DECIMAL(18,2),
+    low_price DECIMAL(18,2),
+    close_price DECIMAL(18,2),
+    volume BIGINT,
+    reasons TEXT[] NOT NULL, -- Failed checks, e.g. {zero_volume,outlier_return}
+    source VARCHAR(20) NOT NULL,
+    quarantined_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(symbol, price_date, reasons) -- Re-downloading the same bad bar does not add a row
+);
+
+-- Data Quality Stats Table: Per-symbol counters updated incrementally by every ingest batch
+CREATE TABLE data_quality_stats (
+    symbol VARCHAR(10) PRIMARY KEY,
+    accepted_rows BIGINT NOT NULL DEFAULT 0,
+    duplicate_rows BIGINT NOT NULL DEFAULT 0,
+    rejected_rows BIGINT NOT NULL DEFAULT 0,
+    null_price BIGINT NOT NULL DEFAULT 0,
+    non_positive_price BIGINT NOT NULL DEFAULT 0,
+    ohlc_inconsistent BIGINT NOT NULL DEFAULT 0,
+    zero_volume BIGINT NOT NULL DEFAULT 0,
+    future_date BIGINT NOT NULL DEFAULT 0,
+    outlier_return BIGINT NOT NULL DEFAULT 0,
+    first_date DATE,
+    last_date DATE,
+    last_close DECIMAL(18,2),
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
@@ -1,14 +1,18 @@
+-- Correlation of daily close-to-close returns with volume per symbol.
+-- Cross-asset return correlation matrices are served by /api/correlation.
 WITH price_volume_data AS (
     SELECT
-        p.symbol,
-        p.price_date AS date,
-        p.price,
-        v.volume
-    FROM prices p
-    JOIN volumes v
-        ON p.symbol = v.symbol
-        AND p.price_date = v.volume_date
+        symbol,
+        price_date AS date,
+        close_price / NULLIF(LAG(close_price) OVER (PARTITION BY symbol ORDER BY price_date), 0) - 1 AS daily_return,
+        volume
+    FROM prices
 )
 SELECT
-    corr(price, volume) AS price_volume_corr
-FROM price_volume_data;
\ No newline at end of file
+    symbol,
+    corr(daily_return, volume) AS return_volume_corr,
+    corr(ABS(daily_return), volume) AS abs_return_volume_corr
+FROM price_volume_data
+WHERE daily_return IS NOT NULL
+GROUP BY symbol
+ORDER BY symbol;
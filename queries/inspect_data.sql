@@ -19,53 +19,29 @@ GROUP BY symbol, price_date
 HAVING COUNT(*) > 1
 ORDER BY duplicate_count DESC;
 
--- Check for missing dates in the last 30 days
-WITH RECURSIVE date_series AS (
-    SELECT CURRENT_DATE - INTERVAL '30 days' as date
-    UNION ALL
-    SELECT date + INTERVAL '1 day'
-    FROM date_series
-    WHERE date < CURRENT_DATE
-),
-missing_dates AS (
-    SELECT 
-        d.date,
-        p.symbol,
-        p.close_price
-    FROM date_series d
-    CROSS JOIN (SELECT DISTINCT symbol FROM prices) s
-    LEFT JOIN prices p ON d.date = p.price_date AND s.symbol = p.symbol
-    WHERE d.date <= CURRENT_DATE
-        AND d.date >= CURRENT_DATE - INTERVAL '30 days'
-        AND EXTRACT(DOW FROM d.date) NOT IN (0, 6) -- Exclude weekends
-)
+-- Check for missing trading sessions (maintained by scripts/gap_index.py against the exchange calendar)
 SELECT 
     symbol,
-    COUNT(*) FILTER (WHERE close_price IS NULL) as missing_days,
-    STRING_AGG(
-        CASE WHEN close_price IS NULL THEN date::text ELSE NULL END,
-        ', '
-    ) as missing_dates
-FROM missing_dates
+    SUM(missing_sessions) as missing_sessions,
+    COUNT(*) as gap_ranges,
+    COUNT(*) FILTER (WHERE attempts > 0) as unfilled_after_backfill,
+    STRING_AGG(gap_start::text || ' to ' || gap_end::text, ', ' ORDER BY gap_start) as missing_ranges
+FROM price_gaps
 GROUP BY symbol
-HAVING COUNT(*) FILTER (WHERE close_price IS NULL) > 0;
+ORDER BY missing_sessions DESC;
 
--- Check for null values in important columns
+-- Check rejected rows per quality check (maintained at ingest, see scripts/data_quality.py)
 SELECT 
     symbol,
-    COUNT(*) FILTER (WHERE open_price IS NULL) as null_open,
-    COUNT(*) FILTER (WHERE high_price IS NULL) as null_high,
-    COUNT(*) FILTER (WHERE low_price IS NULL) as null_low,
-    COUNT(*) FILTER (WHERE close_price IS NULL) as null_close,
-    COUNT(*) FILTER (WHERE volume IS NULL) as null_volume,
-    COUNT(*) as total_records
-FROM prices
-GROUP BY symbol
-HAVING COUNT(*) FILTER (WHERE open_price IS NULL) > 0
-    OR COUNT(*) FILTER (WHERE high_price IS NULL) > 0
-    OR COUNT(*) FILTER (WHERE low_price IS NULL) > 0
-    OR COUNT(*) FILTER (WHERE close_price IS NULL) > 0
-    OR COUNT(*) FILTER (WHERE volume IS NULL) > 0;
+    null_price,
+    non_positive_price,
+    ohlc_inconsistent,
+    zero_volume,
+    future_date,
+    outlier_return,
+    accepted_rows + rejected_rows as total_records
+FROM data_quality_stats
+WHERE rejected_rows > 0;
 
 -- Show the most recent entries
 SELECT 
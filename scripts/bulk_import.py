@@ -0,0 +1,283 @@
+"""Bulk import OHLCV bars from local CSV or Parquet dumps into the prices table.
+
+The file is streamed in fixed-size chunks; each chunk is validated and
+deduplicated with vectorized checks, split by symbol and handed to per-symbol
+writer threads through bounded queues, so memory stays flat regardless of
+file size. Rows go through the same data_quality.ingest_batch as
+populate_historical_data.py, staged with COPY into session temp tables:
+failing rows are quarantined, per-symbol quality counters are updated and
+existing (symbol, price_date) rows are left untouched (ON CONFLICT DO NOTHING).
+The first copy of a repeated (symbol, date) always wins, whether the repeat is
+in the same chunk, a later chunk or already stored, so results do not depend
+on --chunk-size.
+
+    python scripts/bulk_import.py dumps/btc_1m.parquet --symbol BTC --market crypto --aggregate-intraday
+    python scripts/bulk_import.py dumps/stocks.csv --columns date=Date,close="Adj Close" --workers 8
+"""
+import argparse
+import logging
+import os
+import queue
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import psycopg2
+from dotenv import load_dotenv
+
+from data_quality import create_import_tables, ingest_batch
+from migrations import apply_migrations
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+TARGET_COLUMNS = ['symbol', 'date'] + PRICE_COLUMNS + ['volume']
+MAX_SYMBOL_LENGTH = 10  # prices.symbol is VARCHAR(10)
+
+
+def connect():
+    return psycopg2.connect(
+        dbname=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT")
+    )
+
+
+def iter_chunks(path, chunk_size):
+    """Yield DataFrames of at most chunk_size rows from a CSV or Parquet file"""
+    if path.lower().endswith(('.parquet', '.pq')):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Reading Parquet requires pyarrow: pip install pyarrow")
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+def normalize_columns(chunk, mapping, symbol, lowercase=True):
+    """Rename source columns to symbol/date/open/high/low/close/volume"""
+    if lowercase:
+        chunk.columns = [str(col).strip().lower() for col in chunk.columns]
+    chunk = chunk.rename(columns={
+        (source.strip().lower() if lowercase else source): target for target, source in mapping.items()
+    })
+
+    if 'date' not in chunk.columns:
+        for candidate in ('price_date', 'timestamp', 'time', 'datetime'):
+            if candidate in chunk.columns:
+                chunk = chunk.rename(columns={candidate: 'date'})
+                break
+    if symbol is not None:
+        chunk['symbol'] = symbol
+
+    missing = [col for col in TARGET_COLUMNS if col not in chunk.columns]
+    if missing:
+        raise SystemExit(f"Missing columns {missing}; map them with --columns target=source")
+
+    return chunk[TARGET_COLUMNS]
+
+
+def parse_dates(values):
+    """Parse ISO strings or unix timestamps (s or ms) into naive UTC datetimes"""
+    if pd.api.types.is_numeric_dtype(values):
+        unit = 'ms' if values.abs().max() > 1e11 else 's'
+        return pd.to_datetime(values, unit=unit, errors='coerce')
+    parsed = pd.to_datetime(values, errors='coerce', utc=True)
+    return parsed.dt.tz_localize(None)
+
+
+def validate_chunk(chunk, stats):
+    """Drop rows that cannot be parsed at all; value checks happen in data_quality.ingest_batch"""
+    chunk = chunk.copy()
+    # Checked before the string conversion, which would turn NaN/None into 'nan'/'None'
+    missing_symbol = chunk['symbol'].isna().to_numpy()
+    chunk['symbol'] = chunk['symbol'].astype(str).str.strip().str.upper()
+    chunk['date'] = parse_dates(chunk['date'])
+    for col in PRICE_COLUMNS + ['volume']:
+        chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+
+    checks = {
+        'bad_date': chunk['date'].isna().to_numpy(),
+        'bad_symbol': missing_symbol | ((chunk['symbol'].str.len() == 0)
+                                        | (chunk['symbol'].str.len() > MAX_SYMBOL_LENGTH)).to_numpy()
+    }
+
+    rejected = np.zeros(len(chunk), dtype=bool)
+    for reason, mask in checks.items():
+        # Attribute each rejected row to the first failing check only
+        stats[reason] += int((mask & ~rejected).sum())
+        rejected |= mask
+
+    return chunk[~rejected]
+
+
+def aggregate_daily(chunk):
+    """Collapse intraday bars (assumed time-ordered per symbol) into daily OHLCV"""
+    chunk = chunk.sort_values(['symbol', 'date'], kind='stable')
+    chunk['day'] = chunk['date'].dt.normalize()
+    daily = chunk.groupby(['symbol', 'day'], sort=False).agg(
+        open=('open', 'first'),
+        high=('high', 'max'),
+        low=('low', 'min'),
+        close=('close', 'last'),
+        volume=('volume', 'sum')
+    ).reset_index().rename(columns={'day': 'date'})
+    return daily[TARGET_COLUMNS]
+
+
+def split_carry(chunk):
+    """Hold back each symbol's last day: its bars may continue in the next chunk"""
+    days = chunk['date'].dt.normalize()
+    last_day = days.groupby(chunk['symbol']).transform('max')
+    is_carry = (days == last_day).to_numpy()
+    return chunk[~is_carry], chunk[is_carry]
+
+
+def drop_repeated_days(rows):
+    """Keep the first row per (symbol, day), the same rule ON CONFLICT DO NOTHING applies across chunks"""
+    before = len(rows)
+    rows = rows.assign(date=rows['date'].dt.normalize())
+    rows = rows.drop_duplicates(['symbol', 'date'], keep='first')
+    return rows, before - len(rows)
+
+
+class SymbolWriter(threading.Thread):
+    """Writer owning a fixed subset of symbols, so no two writers touch one symbol"""
+
+    def __init__(self, market, today, max_pending, stats, stats_lock):
+        super().__init__(daemon=True)
+        self.market = market
+        self.today = today
+        self.batches = queue.Queue(maxsize=max_pending)
+        self.stats = stats
+        self.stats_lock = stats_lock
+        self.error = None
+
+    def run(self):
+        conn = cur = None
+        try:
+            conn = connect()
+            cur = conn.cursor()
+            create_import_tables(cur)
+            conn.commit()
+        except Exception as e:
+            self.error = e
+            logger.error(f"Writer could not connect: {e}")
+
+        while True:
+            batch = self.batches.get()
+            if batch is None:
+                break
+            if self.error is not None:
+                continue  # Keep draining so the reader never blocks on a dead writer
+            try:
+                inserted = self.write(cur, batch)
+                conn.commit()
+                with self.stats_lock:
+                    self.stats['inserted'] += inserted
+                    self.stats['not_inserted'] += len(batch) - inserted
+            except Exception as e:
+                conn.rollback()
+                self.error = e
+                logger.error(f"Writer failed: {e}")
+
+        if conn is not None:
+            if cur is not None:
+                cur.close()
+            conn.close()
+
+    def write(self, cur, batch):
+        symbol = batch['symbol'].iloc[0]
+        df = batch.set_index(pd.DatetimeIndex(batch['date']))
+        df = df.rename(columns={col: col.capitalize() for col in PRICE_COLUMNS + ['volume']})
+        inserted = ingest_batch(cur, symbol, df, self.today, market_source=self.market,
+                                source='bulk_import', copy=True)
+        return len(inserted)
+
+
+def import_file(args):
+    conn = connect()
+    with conn, conn.cursor() as cur:
+        apply_migrations(cur)
+    conn.close()
+
+    today = date.today()
+    stats = Counter()
+    stats_lock = threading.Lock()
+    writers = [SymbolWriter(args.market, today, args.max_pending, stats, stats_lock) for _ in range(args.workers)]
+    for writer in writers:
+        writer.start()
+
+    def dispatch(rows):
+        rows, duplicates = drop_repeated_days(rows)
+        stats['duplicates'] += duplicates
+
+        for symbol, group in rows.groupby('symbol', sort=False):
+            writers[zlib.crc32(symbol.encode()) % len(writers)].batches.put(group)
+
+    mapping = dict(item.split('=', 1) for item in args.columns.split(',')) if args.columns else {}
+    carry = None
+    started = time.perf_counter()
+
+    for i, raw in enumerate(iter_chunks(args.path, args.chunk_size)):
+        stats['read'] += len(raw)
+        chunk = validate_chunk(normalize_columns(raw, mapping, args.symbol), stats)
+
+        if args.aggregate_intraday:
+            if carry is not None:
+                chunk = pd.concat([carry, chunk], ignore_index=True)
+            ready, carry = split_carry(chunk)
+            if len(ready):
+                dispatch(aggregate_daily(ready))
+        elif len(chunk):
+            dispatch(chunk)
+
+        if (i + 1) % 10 == 0:
+            logger.info(f"Chunk {i + 1}: read {stats['read']}, inserted {stats['inserted']} "
+                        f"({stats['read'] / (time.perf_counter() - started):.0f} rows/s)")
+
+    if carry is not None and len(carry):
+        dispatch(aggregate_daily(carry))
+
+    for writer in writers:
+        writer.batches.put(None)
+    for writer in writers:
+        writer.join()
+
+    errors = [writer.error for writer in writers if writer.error is not None]
+    logger.info(f"Import finished in {time.perf_counter() - started:.1f}s: read {stats['read']}, "
+                f"inserted {stats['inserted']}, existing or quarantined {stats['not_inserted']}, "
+                f"duplicates {stats['duplicates']}, unparseable date {stats['bad_date']}, "
+                f"bad symbol {stats['bad_symbol']}")
+    if errors:
+        raise SystemExit(f"{len(errors)} writer(s) failed; first error: {errors[0]}")
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path', help='CSV or Parquet file')
+    parser.add_argument('--symbol', help='Symbol for single-asset files without a symbol column')
+    parser.add_argument('--market', choices=['stock', 'crypto'], default='stock')
+    parser.add_argument('--columns', help='Column mapping, e.g. date=timestamp,volume=base_volume')
+    parser.add_argument('--aggregate-intraday', action='store_true',
+                        help='Roll intraday bars up into daily OHLCV before loading')
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--max-pending', type=int, default=4,
+                        help='Batches buffered per writer before the reader waits')
+    import_file(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -18,17 +18,18 @@ def check_database():
     
     cur = conn.cursor()
     
+    # Sections 1, 3 and 4 read the small tables maintained at ingest time
+    # (scripts/data_quality.py) instead of scanning prices
     print("\n1. Data Summary by Symbol:")
     cur.execute("""
         SELECT 
             symbol, 
-            COUNT(*) as records,
-            MIN(price_date) as earliest,
-            MAX(price_date) as latest,
-            COUNT(*) FILTER (WHERE close_price IS NULL) as null_prices,
-            COUNT(*) FILTER (WHERE volume = 0 OR volume IS NULL) as zero_volume
-        FROM prices
-        GROUP BY symbol
+            accepted_rows,
+            first_date,
+            last_date,
+            null_price,
+            zero_volume
+        FROM data_quality_stats
         ORDER BY symbol;
     """)
     results = cur.fetchall()
@@ -53,35 +54,37 @@ def check_database():
     results = cur.fetchall()
     print(tabulate(results, headers=['Symbol', 'Date', 'Close', 'Volume'], tablefmt='psql'))
     
-    print("\n3. Data Quality Issues:")
+    print("\n3. Data Quality Issues (most recently quarantined):")
     cur.execute("""
-        SELECT symbol, price_date, close_price, volume
-        FROM prices
-        WHERE close_price IS NULL 
-           OR volume = 0 
-           OR volume IS NULL
-        ORDER BY price_date DESC
+        SELECT symbol, price_date, close_price, volume, ARRAY_TO_STRING(reasons, ', ')
+        FROM prices_quarantine
+        ORDER BY quarantined_at DESC, price_date DESC
         LIMIT 10;
     """)
     results = cur.fetchall()
     print(tabulate(results, 
-                  headers=['Symbol', 'Date', 'Close', 'Volume'], 
+                  headers=['Symbol', 'Date', 'Close', 'Volume', 'Reasons'], 
                   tablefmt='psql'))
     
     print("\n4. Data Quality Metrics:")
     cur.execute("""
         SELECT 
             symbol, 
-            COUNT(*) as total_rows,
-            COUNT(*) FILTER (WHERE close_price IS NULL) as null_close,
-            COUNT(*) FILTER (WHERE volume = 0 OR volume IS NULL) as zero_volume
-        FROM prices
-        GROUP BY symbol
+            accepted_rows + rejected_rows as total_rows,
+            rejected_rows,
+            null_price,
+            non_positive_price,
+            ohlc_inconsistent,
+            zero_volume,
+            outlier_return,
+            future_date
+        FROM data_quality_stats
         ORDER BY symbol;
     """)
     results = cur.fetchall()
     print(tabulate(results, 
-                  headers=['Symbol', 'Total Rows', 'Null Close', 'Zero Volume'], 
+                  headers=['Symbol', 'Total Rows', 'Rejected', 'Null Price', 'Non-Positive', 
+                           'OHLC Inconsistent', 'Zero Volume', 'Outlier Return', 'Future Date'], 
                   tablefmt='psql'))
     
     cur.close()
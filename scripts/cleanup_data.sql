@@ -1,41 +1,93 @@
--- Remove entries with NULL prices (these are likely invalid)
-DELETE FROM prices 
-WHERE close_price IS NULL 
-   OR open_price IS NULL 
-   OR high_price IS NULL 
-   OR low_price IS NULL;
--- Log the number of rows affected
-DO $$ 
-DECLARE
-    rows_deleted INTEGER;
-BEGIN
-    GET DIAGNOSTICS rows_deleted = ROW_COUNT;
-    RAISE NOTICE 'Deleted % rows with NULL prices', rows_deleted;
-END $$;
+-- One-time migration for rows loaded before ingest-time quality checks.
+-- New data is checked as it is inserted (scripts/data_quality.py), so this
+-- no longer needs to be run after every import. Bad rows are moved to
+-- prices_quarantine rather than deleted, and data_quality_stats is seeded
+-- so check_data.py does not have to scan prices.
+-- Run with psql, which creates the tables first if they are missing:
+--   psql -f scripts/cleanup_data.sql
 
--- Remove future dates
-DELETE FROM prices 
-WHERE price_date > CURRENT_DATE;
--- Log the number of rows affected
-DO $$ 
-DECLARE
-    rows_deleted INTEGER;
-BEGIN
-    GET DIAGNOSTICS rows_deleted = ROW_COUNT;
-    RAISE NOTICE 'Deleted % rows with future dates', rows_deleted;
-END $$;
+\ir ../db/migrations.sql
 
--- Remove entries with zero volume (likely invalid market data)
-DELETE FROM prices 
-WHERE volume = 0 OR volume IS NULL;
--- Log the number of rows affected
-DO $$ 
-DECLARE
-    rows_deleted INTEGER;
-BEGIN
-    GET DIAGNOSTICS rows_deleted = ROW_COUNT;
-    RAISE NOTICE 'Deleted % rows with zero volume', rows_deleted;
-END $$;
+BEGIN;
+
+-- Move entries with NULL or non-positive prices, future dates or zero volume to quarantine
+WITH flagged AS (
+    SELECT 
+        id,
+        ARRAY_REMOVE(ARRAY[
+            CASE WHEN open_price IS NULL OR high_price IS NULL 
+                   OR low_price IS NULL OR close_price IS NULL THEN 'null_price' END,
+            CASE WHEN open_price <= 0 OR high_price <= 0 
+                   OR low_price <= 0 OR close_price <= 0 THEN 'non_positive_price' END,
+            CASE WHEN volume = 0 OR volume IS NULL THEN 'zero_volume' END,
+            CASE WHEN price_date > CURRENT_DATE THEN 'future_date' END
+        ], NULL) as reasons
+    FROM prices
+),
+moved AS (
+    DELETE FROM prices p
+    USING flagged f
+    WHERE p.id = f.id AND CARDINALITY(f.reasons) > 0
+    RETURNING p.symbol, p.price_date, p.open_price, p.high_price, p.low_price, 
+              p.close_price, p.volume, f.reasons
+)
+INSERT INTO prices_quarantine 
+    (symbol, price_date, open_price, high_price, low_price, close_price, volume, reasons, source)
+SELECT symbol, price_date, open_price, high_price, low_price, close_price, volume, reasons, 'legacy_cleanup'
+FROM moved
+ON CONFLICT (symbol, price_date, reasons) DO NOTHING;
+
+-- Seed the per-symbol counters from what remains and what was quarantined
+INSERT INTO data_quality_stats (
+    symbol, accepted_rows, rejected_rows,
+    null_price, non_positive_price, zero_volume, future_date,
+    first_date, last_date, last_close
+)
+SELECT 
+    COALESCE(a.symbol, q.symbol),
+    COALESCE(a.accepted_rows, 0),
+    COALESCE(q.rejected_rows, 0),
+    COALESCE(q.null_price, 0),
+    COALESCE(q.non_positive_price, 0),
+    COALESCE(q.zero_volume, 0),
+    COALESCE(q.future_date, 0),
+    a.first_date,
+    a.last_date,
+    a.last_close
+FROM (
+    SELECT 
+        symbol,
+        COUNT(*) as accepted_rows,
+        MIN(price_date) as first_date,
+        MAX(price_date) as last_date,
+        (ARRAY_AGG(close_price ORDER BY price_date DESC))[1] as last_close
+    FROM prices
+    GROUP BY symbol
+) a
+FULL OUTER JOIN (
+    SELECT 
+        symbol,
+        COUNT(*) as rejected_rows,
+        COUNT(*) FILTER (WHERE 'null_price' = ANY(reasons)) as null_price,
+        COUNT(*) FILTER (WHERE 'non_positive_price' = ANY(reasons)) as non_positive_price,
+        COUNT(*) FILTER (WHERE 'zero_volume' = ANY(reasons)) as zero_volume,
+        COUNT(*) FILTER (WHERE 'future_date' = ANY(reasons)) as future_date
+    FROM prices_quarantine
+    GROUP BY symbol
+) q ON a.symbol = q.symbol
+ON CONFLICT (symbol) DO UPDATE SET
+    accepted_rows = EXCLUDED.accepted_rows,
+    rejected_rows = EXCLUDED.rejected_rows,
+    null_price = EXCLUDED.null_price,
+    non_positive_price = EXCLUDED.non_positive_price,
+    zero_volume = EXCLUDED.zero_volume,
+    future_date = EXCLUDED.future_date,
+    first_date = EXCLUDED.first_date,
+    last_date = EXCLUDED.last_date,
+    last_close = EXCLUDED.last_close,
+    updated_at = NOW();
+
+COMMIT;
 
 -- Analyze the table for better query performance
 ANALYZE prices;
@@ -0,0 +1,327 @@
+import io
+import logging
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from psycopg2.extras import execute_values
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Daily close-to-close moves beyond this are quarantined for review
+OUTLIER_RETURN_THRESHOLD = 0.5
+# Consecutive agreeing outliers that confirm a genuine level shift (crash, unadjusted split)
+LEVEL_SHIFT_CONFIRM_BARS = 3
+
+CHECKS = ['null_price', 'non_positive_price', 'ohlc_inconsistent', 'zero_volume', 'future_date', 'outlier_return']
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+PRICE_FIELDS = ['open_price', 'high_price', 'low_price', 'close_price']
+
+
+def flag_outliers(close, valid, prev_close=None, threshold=OUTLIER_RETURN_THRESHOLD,
+                  confirm_bars=LEVEL_SHIFT_CONFIRM_BARS):
+    """Flag valid closes that jump more than threshold from the last accepted close.
+
+    A jump followed by a return to the old level is an isolated bad print and
+    stays flagged. Once confirm_bars consecutive suspects agree with each
+    other the move is treated as real: they are accepted and become the new
+    reference, so a crash or split cannot lock the symbol out.
+    """
+    outlier = np.zeros(len(close), dtype=bool)
+    idx = np.flatnonzero(valid)
+    if idx.size == 0:
+        return outlier
+
+    # Fast path: no step between consecutive valid closes exceeds the threshold
+    prices = close[idx]
+    steps = np.abs(prices[1:] / prices[:-1] - 1)
+    first_ok = prev_close is None or abs(prices[0] / prev_close - 1) <= threshold
+    if first_ok and not (steps > threshold).any():
+        return outlier
+
+    reference = prev_close
+    run = []
+    for i in idx:
+        price = close[i]
+        if reference is None or abs(price / reference - 1) <= threshold:
+            reference = price
+            run = []  # Earlier suspects were isolated prints
+            continue
+
+        if run and abs(price / close[run[-1]] - 1) > threshold:
+            run = []  # Disagrees with the previous suspects, start a new run
+        run.append(i)
+        outlier[i] = True
+
+        if len(run) >= confirm_bars:
+            outlier[run] = False
+            reference = price
+            run = []
+
+    return outlier
+
+
+def check_batch(df, today, prev_close=None, outlier_threshold=OUTLIER_RETURN_THRESHOLD,
+                confirm_bars=LEVEL_SHIFT_CONFIRM_BARS):
+    """Run every quality check over a date-sorted batch for one symbol.
+
+    df has a DatetimeIndex and Open/High/Low/Close/Volume columns. Returns a
+    (rows, checks) boolean DataFrame of failures. Row-level checks are array
+    masks; the outlier check walks the valid closes (see flag_outliers),
+    seeded with prev_close, the last stored close before the batch.
+    """
+    prices = df[PRICE_COLUMNS].to_numpy(dtype=np.float64)
+    volume = df['Volume'].to_numpy(dtype=np.float64)
+    open_, high, low, close = prices.T
+
+    failures = pd.DataFrame(index=df.index)
+    failures['null_price'] = ~np.isfinite(prices).all(axis=1)
+    with np.errstate(invalid='ignore'):
+        failures['non_positive_price'] = (prices <= 0).any(axis=1)
+        failures['ohlc_inconsistent'] = (
+            (high < low) | (high < np.maximum(open_, close)) | (low > np.minimum(open_, close))
+        )
+        failures['zero_volume'] = ~(volume > 0)
+    failures['future_date'] = df.index.date > today
+
+    base_invalid = failures.to_numpy().any(axis=1)
+    failures['outlier_return'] = flag_outliers(close, ~base_invalid, prev_close,
+                                               outlier_threshold, confirm_bars)
+    return failures
+
+
+def create_import_tables(cur):
+    """Session temp tables used by ingest_batch(copy=True) to stage COPY loads"""
+    cur.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS prices_import (
+            symbol VARCHAR(10), price_date DATE,
+            open_price DECIMAL(18,2), high_price DECIMAL(18,2),
+            low_price DECIMAL(18,2), close_price DECIMAL(18,2),
+            volume BIGINT, market_source VARCHAR(20)
+        )
+    """)
+    cur.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS quarantine_import (
+            symbol VARCHAR(10), price_date DATE,
+            open_price DECIMAL(18,2), high_price DECIMAL(18,2),
+            low_price DECIMAL(18,2), close_price DECIMAL(18,2),
+            volume BIGINT, reasons TEXT[], source VARCHAR(20)
+        )
+    """)
+
+
+def price_frame(symbol, df):
+    """Build prices-table columns for a batch without per-row Python work.
+
+    Non-finite values become NULL; volume is a nullable integer column.
+    """
+    out = pd.DataFrame({'symbol': symbol, 'price_date': df.index.strftime('%Y-%m-%d')})
+    for column, field in zip(PRICE_COLUMNS, PRICE_FIELDS):
+        values = df[column].to_numpy(dtype=np.float64)
+        out[field] = np.where(np.isfinite(values), values, np.nan)
+
+    volume = df['Volume'].to_numpy(dtype=np.float64)
+    finite = np.isfinite(volume)
+    out['volume'] = pd.arrays.IntegerArray(np.where(finite, volume, 0).round().astype(np.int64), ~finite)
+    return out
+
+
+def reason_literals(failures):
+    """Postgres array literals such as {zero_volume,outlier_return}, one per row"""
+    mask = failures[CHECKS].to_numpy()
+    joined = pd.Series('', index=range(len(mask)))
+    for j, check in enumerate(CHECKS):
+        joined += np.where(mask[:, j], check + ',', '')
+    return ('{' + joined.str.rstrip(',') + '}').to_numpy()
+
+
+def _copy_frame(cur, table, frame):
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False, header=False, float_format='%.2f')
+    buffer.seek(0)
+    cur.copy_expert(f"COPY {table} ({', '.join(frame.columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def _frame_rows(frame):
+    return list(frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None))
+
+
+def quarantine_rows(cur, symbol, df, failures, source, copy=False):
+    """Copy rejected rows with their failed checks into prices_quarantine.
+
+    Rows already quarantined for the same reasons (a re-download of the same
+    bad bar) are skipped. Returns a Counter of newly quarantined rows per
+    check plus a 'rows' total.
+    """
+    if not len(df):
+        return Counter()
+
+    frame = price_frame(symbol, df)
+    frame['reasons'] = reason_literals(failures)
+    frame['source'] = source
+    columns = ', '.join(frame.columns)
+
+    if copy:
+        _copy_frame(cur, 'quarantine_import', frame)
+        cur.execute(f"""
+            INSERT INTO prices_quarantine ({columns})
+            SELECT {columns} FROM quarantine_import
+            ON CONFLICT (symbol, price_date, reasons) DO NOTHING
+            RETURNING reasons
+        """)
+        returned = cur.fetchall()
+        cur.execute("TRUNCATE quarantine_import")
+    else:
+        returned = execute_values(cur, f"""
+            INSERT INTO prices_quarantine ({columns})
+            VALUES %s
+            ON CONFLICT (symbol, price_date, reasons) DO NOTHING
+            RETURNING reasons
+        """, _frame_rows(frame), template="(%s, %s, %s, %s, %s, %s, %s, %s::text[], %s)",
+            page_size=1000, fetch=True)
+
+    counts = Counter(check for (reasons,) in returned for check in reasons)
+    counts['rows'] = len(returned)
+    return counts
+
+
+def insert_rows(cur, symbol, df, market_source, copy=False):
+    """Insert accepted rows, ignoring ones already stored. Returns the inserted dates."""
+    if not len(df):
+        return set()
+
+    frame = price_frame(symbol, df)
+    frame['market_source'] = market_source
+    columns = ', '.join(frame.columns)
+
+    if copy:
+        _copy_frame(cur, 'prices_import', frame)
+        cur.execute(f"""
+            INSERT INTO prices ({columns})
+            SELECT {columns} FROM prices_import
+            ON CONFLICT (symbol, price_date) DO NOTHING
+            RETURNING price_date
+        """)
+        returned = cur.fetchall()
+        cur.execute("TRUNCATE prices_import")
+    else:
+        returned = execute_values(cur, f"""
+            INSERT INTO prices ({columns})
+            VALUES %s
+            ON CONFLICT (symbol, price_date) DO NOTHING
+            RETURNING price_date
+        """, _frame_rows(frame), page_size=1000, fetch=True)
+
+    return {row[0] for row in returned}
+
+
+def load_reference(cur, symbol, before):
+    """Last stored close before the batch and the unconfirmed outliers after it.
+
+    The pending outliers are re-checked with the batch so a level shift that
+    started in an earlier batch can still be confirmed and released.
+    """
+    cur.execute("""
+        SELECT price_date, close_price
+        FROM prices
+        WHERE symbol = %s AND price_date < %s
+        ORDER BY price_date DESC
+        LIMIT 1
+    """, (symbol, before))
+    row = cur.fetchone()
+    last_date, prev_close = (row[0], float(row[1])) if row else (None, None)
+
+    cur.execute("""
+        SELECT price_date, open_price, high_price, low_price, close_price, volume
+        FROM prices_quarantine
+        WHERE symbol = %s
+          AND price_date < %s
+          AND (%s IS NULL OR price_date > %s)
+          AND reasons = ARRAY['outlier_return']
+        ORDER BY price_date
+    """, (symbol, before, last_date, last_date))
+    pending = pd.DataFrame(cur.fetchall(), columns=['Date'] + PRICE_COLUMNS + ['Volume'])
+    pending = pending.set_index(pd.DatetimeIndex(pending.pop('Date'))).astype(np.float64)
+    return prev_close, pending
+
+
+def release_pending(cur, symbol, dates):
+    """Remove outliers confirmed as a level shift from the quarantine. Returns the count."""
+    if not len(dates):
+        return 0
+    cur.execute("""
+        DELETE FROM prices_quarantine
+        WHERE symbol = %s AND price_date = ANY(%s) AND reasons = ARRAY['outlier_return']
+    """, (symbol, [index.date() for index in dates]))
+    return cur.rowcount
+
+
+def update_symbol_stats(cur, symbol, accepted, inserted, duplicates, quarantined, released):
+    """Fold one batch into the per-symbol counters instead of rescanning prices"""
+    last_date = accepted.index.max().date() if len(accepted) else None
+    last_close = float(accepted['Close'].iloc[-1]) if len(accepted) else None
+
+    cur.execute("""
+        INSERT INTO data_quality_stats AS s (
+            symbol, accepted_rows, duplicate_rows, rejected_rows,
+            null_price, non_positive_price, ohlc_inconsistent, zero_volume, future_date, outlier_return,
+            first_date, last_date, last_close, updated_at
+        )
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
+        ON CONFLICT (symbol) DO UPDATE SET
+            accepted_rows = s.accepted_rows + EXCLUDED.accepted_rows,
+            duplicate_rows = s.duplicate_rows + EXCLUDED.duplicate_rows,
+            rejected_rows = s.rejected_rows + EXCLUDED.rejected_rows,
+            null_price = s.null_price + EXCLUDED.null_price,
+            non_positive_price = s.non_positive_price + EXCLUDED.non_positive_price,
+            ohlc_inconsistent = s.ohlc_inconsistent + EXCLUDED.ohlc_inconsistent,
+            zero_volume = s.zero_volume + EXCLUDED.zero_volume,
+            future_date = s.future_date + EXCLUDED.future_date,
+            outlier_return = s.outlier_return + EXCLUDED.outlier_return,
+            first_date = LEAST(s.first_date, EXCLUDED.first_date),
+            last_close = CASE WHEN EXCLUDED.last_date >= s.last_date OR s.last_date IS NULL
+                              THEN EXCLUDED.last_close ELSE s.last_close END,
+            last_date = GREATEST(s.last_date, EXCLUDED.last_date),
+            updated_at = NOW()
+    """, (
+        symbol, inserted, duplicates, quarantined['rows'] - released,
+        *[quarantined[check] - (released if check == 'outlier_return' else 0) for check in CHECKS],
+        accepted.index.min().date() if len(accepted) else None, last_date, last_close
+    ))
+
+
+def ingest_batch(cur, symbol, df, today, market_source='stock', source='yfinance', copy=False):
+    """Check a batch, insert accepted rows, quarantine the rest and update counters.
+
+    Returns the accepted rows that were actually inserted (not already stored),
+    in date order. The caller owns the transaction. With copy=True rows are
+    staged through COPY into the temp tables from create_import_tables.
+    """
+    # First copy wins, as for rows already stored
+    df = df[~df.index.duplicated(keep='first')].sort_index()
+    if not len(df):
+        return df
+
+    prev_close, pending = load_reference(cur, symbol, df.index[0].date())
+    if len(pending):
+        df = pd.concat([pending, df[pending.columns]])
+
+    failures = check_batch(df, today, prev_close)
+    rejected = failures.any(axis=1).to_numpy()
+    accepted = df[~rejected]
+
+    quarantined = quarantine_rows(cur, symbol, df[rejected], failures[rejected], source, copy)
+    inserted_dates = insert_rows(cur, symbol, accepted, market_source, copy)
+    released = release_pending(cur, symbol, pending.index.intersection(accepted.index))
+
+    inserted = accepted[accepted.index.normalize().isin(pd.DatetimeIndex(list(inserted_dates)))]
+    update_symbol_stats(cur, symbol, accepted, len(inserted), len(accepted) - len(inserted),
+                        quarantined, released)
+
+    if quarantined['rows']:
+        logger.info(f"Quarantined {quarantined['rows']} new rows for {symbol}: "
+                    f"{ {check: quarantined[check] for check in CHECKS if quarantined[check]} }")
+    if released:
+        logger.info(f"Released {released} quarantined rows for {symbol} as a confirmed level shift")
+    return inserted
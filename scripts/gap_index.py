@@ -0,0 +1,181 @@
+import os
+import logging
+from datetime import date, timedelta
+
+import numpy as np
+import psycopg2
+from psycopg2.extras import execute_values
+from dotenv import load_dotenv
+
+from migrations import apply_migrations
+from trading_calendar import trading_sessions
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Gaps the provider failed to fill this many times are treated as genuine holes
+MAX_GAP_ATTEMPTS = 3
+
+# Dates a symbol already has: stored prices plus quarantined bars the provider
+# already returned. Future-dated quarantine rows are left out, since they would
+# move the end of the history past today.
+STORED_DATES = """
+    SELECT symbol, price_date, market_source FROM prices
+    UNION ALL
+    SELECT symbol, price_date, NULL FROM prices_quarantine
+    WHERE NOT ('future_date' = ANY(reasons)) AND price_date <= CURRENT_DATE
+"""
+
+
+def find_missing_ranges(dates, sessions):
+    """Return (start, end, missing_sessions) runs of sessions absent from dates.
+
+    Both inputs are sorted datetime64[D] arrays; the comparison and run
+    detection are vectorized so a symbol's full history is handled in one pass.
+    """
+    missing = ~np.isin(sessions, dates, assume_unique=True)
+    idx = np.flatnonzero(missing)
+    if idx.size == 0:
+        return []
+
+    breaks = np.flatnonzero(np.diff(idx) > 1)
+    starts = idx[np.r_[0, breaks + 1]]
+    ends = idx[np.r_[breaks, idx.size - 1]]
+
+    return [
+        (sessions[s].item(), sessions[e].item(), int(e - s + 1))
+        for s, e in zip(starts, ends)
+    ]
+
+
+def last_stored_dates(cur):
+    """Latest stored or quarantined date per symbol, where the next fetch starts"""
+    cur.execute(f"SELECT symbol, MAX(price_date) FROM ({STORED_DATES}) stored GROUP BY symbol")
+    return dict(cur.fetchall())
+
+
+def refresh_gap_index(cur, symbols=None, today=None):
+    """Recompute missing-session ranges inside each symbol's stored history.
+
+    Dates for every symbol are read in a single grouped scan of prices and
+    compared against the exchange calendar. Dates held in prices_quarantine
+    count as present: the provider already returned them and re-fetching
+    would only quarantine the same bars again. Sessions never extend past
+    today. Results are upserted into price_gaps so retry counters survive
+    re-detection; repaired gaps are removed.
+    """
+    today = np.datetime64(today or date.today(), 'D')
+    query = """
+        SELECT symbol, MAX(market_source), ARRAY_AGG(DISTINCT price_date ORDER BY price_date)
+        FROM ({stored}) stored
+        {where}
+        GROUP BY symbol
+        HAVING COUNT(market_source) > 0
+    """
+    if symbols is None:
+        cur.execute(query.format(stored=STORED_DATES, where=""))
+    else:
+        cur.execute(query.format(stored=STORED_DATES, where="WHERE symbol = ANY(%s)"), (list(symbols),))
+
+    summary = {}
+    for symbol, market_source, dates in cur.fetchall():
+        dates = np.array(dates, dtype='datetime64[D]')
+        dates = dates[dates <= today]
+        gaps = []
+        if dates.size:
+            sessions = trading_sessions(market_source, dates[0].item(), dates[-1].item())
+            gaps = find_missing_ranges(dates, sessions)
+
+        if gaps:
+            execute_values(cur, """
+                INSERT INTO price_gaps (symbol, gap_start, gap_end, missing_sessions, detected_at)
+                VALUES %s
+                ON CONFLICT (symbol, gap_start) DO UPDATE
+                SET gap_end = EXCLUDED.gap_end,
+                    missing_sessions = EXCLUDED.missing_sessions,
+                    detected_at = EXCLUDED.detected_at
+            """, [(symbol, start, end, count) for start, end, count in gaps],
+                template="(%s, %s, %s, %s, NOW())")
+
+        cur.execute("""
+            DELETE FROM price_gaps
+            WHERE symbol = %s AND NOT (gap_start = ANY(%s))
+        """, (symbol, [start for start, _, _ in gaps]))
+
+        summary[symbol] = sum(count for _, _, count in gaps)
+        logger.info(f"Gap index for {symbol}: {len(gaps)} ranges, {summary[symbol]} missing sessions")
+
+    return summary
+
+
+def load_gaps(cur, symbol, max_attempts=MAX_GAP_ATTEMPTS):
+    """Open gap ranges for symbol that are still worth asking the provider for"""
+    cur.execute("""
+        SELECT gap_start, gap_end
+        FROM price_gaps
+        WHERE symbol = %s AND attempts < %s
+        ORDER BY gap_start
+    """, (symbol, max_attempts))
+    return cur.fetchall()
+
+
+def plan_backfill(gaps, sessions, max_bridge_sessions=5):
+    """Merge gap ranges into as few provider requests as possible.
+
+    Two gaps separated by at most max_bridge_sessions present sessions are
+    fetched as one range; re-downloading those few bars is cheaper than an
+    extra provider call and the inserts ignore rows that already exist.
+    """
+    if not gaps:
+        return []
+
+    sessions = np.asarray(sessions, dtype='datetime64[D]')
+    plan = []
+    for start, end in gaps:
+        if plan:
+            between = (np.searchsorted(sessions, np.datetime64(start, 'D'))
+                       - np.searchsorted(sessions, np.datetime64(plan[-1][1], 'D'), side='right'))
+            if between <= max_bridge_sessions:
+                plan[-1][1] = max(plan[-1][1], end)
+                continue
+        plan.append([start, end])
+
+    return [(start, end) for start, end in plan]
+
+
+def record_attempt(cur, symbol, start, end):
+    """Count a provider request against every gap inside [start, end]"""
+    cur.execute("""
+        UPDATE price_gaps
+        SET attempts = attempts + 1, last_attempt_at = NOW()
+        WHERE symbol = %s AND gap_start BETWEEN %s AND %s
+    """, (symbol, start, end))
+
+
+def provider_range(start, end):
+    """yfinance treats the end date as exclusive"""
+    return start, end + timedelta(days=1)
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    conn = psycopg2.connect(
+        dbname=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT")
+    )
+    cur = conn.cursor()
+
+    apply_migrations(cur)
+    summary = refresh_gap_index(cur)
+    conn.commit()
+
+    for symbol, missing in sorted(summary.items()):
+        print(f"{symbol}: {missing} missing sessions")
+
+    cur.close()
+    conn.close()
@@ -0,0 +1,339 @@
+"""Load-test harness for the Flask backend.
+
+Seed a local Postgres with synthetic OHLCV history, then replay the request
+mix the React pages generate and report latency percentiles, throughput and
+connection pool saturation:
+
+    python scripts/load_test.py seed --symbols 300 --years 30
+    python scripts/load_test.py run --concurrency 32 --duration 60 --output reports/run.json
+    python scripts/load_test.py run --concurrency 32 --duration 60 --compare reports/run.json
+
+Seeding targets the database from the usual DB_* variables and refuses to
+touch a database whose name does not contain "loadtest" unless --force is given.
+Pool metrics need the backend started with POOL_STATUS_ENABLED=true.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import psycopg2
+import requests
+from dotenv import load_dotenv
+
+SYMBOL_PREFIX = 'SYN'
+STRATEGIES = ['RSI', 'MACD']
+
+
+def connect():
+    return psycopg2.connect(
+        dbname=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT")
+    )
+
+
+def synthetic_ohlcv(n_days, rng, start_price=None):
+    """Geometric Brownian motion closes with plausible open/high/low/volume around them"""
+    drift = rng.normal(0.0003, 0.0002)
+    vol = rng.uniform(0.01, 0.04)
+    log_returns = rng.normal(drift, vol, n_days)
+    close = (start_price or rng.uniform(10, 500)) * np.exp(np.cumsum(log_returns))
+
+    open_ = close * np.exp(rng.normal(0, vol / 3, n_days))
+    spread = np.abs(rng.normal(0, vol / 2, n_days))
+    high = np.maximum(open_, close) * (1 + spread)
+    low = np.minimum(open_, close) * (1 - spread)
+    volume = rng.lognormal(14, 1, n_days).astype(np.int64)
+
+    return open_, high, low, close, volume
+
+
+def seed(args):
+    conn = connect()
+    db_name = conn.get_dsn_parameters()['dbname']
+    if 'loadtest' not in db_name and not args.force:
+        raise SystemExit(f"Refusing to seed database '{db_name}'; use a *loadtest* database or --force")
+
+    cur = conn.cursor()
+    rng = np.random.default_rng(args.seed)
+    end = pd.Timestamp(date.today()) - pd.offsets.BDay(1)
+    dates = pd.bdate_range(end=end, periods=args.years * 252)
+    date_strings = dates.strftime('%Y-%m-%d')
+
+    if args.reset:
+        cur.execute("DELETE FROM prices WHERE symbol LIKE %s", (f"{SYMBOL_PREFIX}%",))
+        conn.commit()
+
+    started = time.perf_counter()
+    for i in range(args.symbols):
+        symbol = f"{SYMBOL_PREFIX}{i:04d}"
+        open_, high, low, close, volume = synthetic_ohlcv(len(dates), rng)
+
+        frame = pd.DataFrame({
+            'symbol': symbol,
+            'price_date': date_strings,
+            'open_price': open_.round(2),
+            'high_price': high.round(2),
+            'low_price': low.round(2),
+            'close_price': close.round(2),
+            'volume': volume,
+            'market_source': 'stock'
+        })
+        buffer = io.StringIO()
+        frame.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+
+        # COPY into a temp table, then merge with the ingest script's conflict rule
+        cur.execute("CREATE TEMP TABLE IF NOT EXISTS prices_seed (LIKE prices INCLUDING DEFAULTS) ON COMMIT DELETE ROWS")
+        cur.copy_expert("""
+            COPY prices_seed (symbol, price_date, open_price, high_price, low_price, close_price, volume, market_source)
+            FROM STDIN WITH (FORMAT csv)
+        """, buffer)
+        cur.execute("""
+            INSERT INTO prices (symbol, price_date, open_price, high_price, low_price, close_price, volume, market_source)
+            SELECT symbol, price_date, open_price, high_price, low_price, close_price, volume, market_source
+            FROM prices_seed
+            ON CONFLICT (symbol, price_date) DO NOTHING
+        """)
+        conn.commit()
+
+        if (i + 1) % 25 == 0 or i + 1 == args.symbols:
+            print(f"Seeded {i + 1}/{args.symbols} symbols ({len(dates)} bars each)")
+
+    cur.execute("ANALYZE prices")
+    conn.commit()
+    cur.close()
+    conn.close()
+    print(f"Seeding finished in {time.perf_counter() - started:.1f}s")
+
+
+class Recorder:
+    """Thread-safe collection of per-endpoint latencies and failures"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def record(self, endpoint, seconds, ok):
+        with self.lock:
+            self.latencies[endpoint].append(seconds)
+            if not ok:
+                self.errors[endpoint] += 1
+
+
+def timed_get(session, recorder, base_url, endpoint, path, params=None):
+    started = time.perf_counter()
+    try:
+        response = session.get(f"{base_url}{path}", params=params, timeout=60)
+        ok = response.status_code < 400
+        body = response.json() if ok else None
+    except (requests.RequestException, ValueError):
+        ok, body = False, None
+    recorder.record(endpoint, time.perf_counter() - started, ok)
+    return body
+
+
+def virtual_user(args, symbols, recorder, deadline, seed):
+    """Repeat the dashboard flow: chart load, trades table, paging, occasional /chart_data"""
+    rng = random.Random(seed)
+    session = requests.Session()
+    end_date = date.today() - timedelta(days=1)
+    start_date = end_date - timedelta(days=30)
+
+    while time.monotonic() < deadline:
+        symbol = rng.choice(symbols)
+        strategy = rng.choice(STRATEGIES)
+
+        # StrategyChart: connectivity probe, then the full series
+        timed_get(session, recorder, args.base_url, '/api/test', '/api/test')
+        timed_get(session, recorder, args.base_url, '/api/strategy_data', '/api/strategy_data', {
+            'symbol': symbol, 'strategy': strategy,
+            'start_date': start_date.isoformat(), 'end_date': end_date.isoformat()
+        })
+
+        # StrategyTable: first page, then a few pagination clicks
+        body = timed_get(session, recorder, args.base_url, '/api/trades', '/api/trades', {
+            'symbol': symbol, 'strategy': strategy, 'page': 1, 'per_page': 10
+        })
+        pages = body.get('pages', 1) if body else 1
+        for page in range(2, min(pages, 1 + rng.randint(0, args.max_page_clicks)) + 1):
+            timed_get(session, recorder, args.base_url, '/api/trades', '/api/trades', {
+                'symbol': symbol, 'strategy': strategy, 'page': page, 'per_page': 10
+            })
+
+        if rng.random() < args.chart_data_ratio:
+            timed_get(session, recorder, args.base_url, '/chart_data', f"/chart_data/{strategy}/{symbol}")
+
+        if args.think_time:
+            time.sleep(rng.uniform(0, 2 * args.think_time))
+
+
+def poll_pool(base_url, samples, stop, interval=0.5):
+    session = requests.Session()
+    while not stop.is_set():
+        try:
+            response = session.get(f"{base_url}/api/pool_status", timeout=5)
+            if response.status_code == 404:
+                print("Pool status is disabled on the server (set POOL_STATUS_ENABLED=true); skipping pool metrics")
+                return
+            samples.append(response.json())
+        except (requests.RequestException, ValueError):
+            pass
+        stop.wait(interval)
+
+
+def summarize(recorder, pool_samples, elapsed, args):
+    endpoints = {}
+    total = 0
+    for endpoint, values in sorted(recorder.latencies.items()):
+        ms = np.array(values) * 1000
+        total += len(ms)
+        endpoints[endpoint] = {
+            'requests': len(ms),
+            'errors': recorder.errors[endpoint],
+            'throughput_rps': len(ms) / elapsed,
+            'p50_ms': float(np.percentile(ms, 50)),
+            'p90_ms': float(np.percentile(ms, 90)),
+            'p99_ms': float(np.percentile(ms, 99)),
+            'max_ms': float(ms.max())
+        }
+
+    pool = {}
+    if pool_samples:
+        checked_out = np.array([s['checked_out'] for s in pool_samples])
+        capacity = pool_samples[0]['size'] + max(pool_samples[0]['max_overflow'], 0)
+        pool = {
+            'samples': len(pool_samples),
+            'capacity': capacity,
+            'max_checked_out': int(checked_out.max()),
+            'mean_checked_out': float(checked_out.mean()),
+            'saturated_fraction': float((checked_out >= capacity).mean()) if capacity else None
+        }
+
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'commit': commit,
+        'config': {
+            'base_url': args.base_url,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'symbols': args.symbols
+        },
+        'elapsed_seconds': elapsed,
+        'total_requests': total,
+        'throughput_rps': total / elapsed,
+        'endpoints': endpoints,
+        'pool': pool
+    }
+
+
+def print_report(report, baseline=None):
+    print(f"\n{report['total_requests']} requests in {report['elapsed_seconds']:.1f}s "
+          f"({report['throughput_rps']:.1f} req/s) at concurrency {report['config']['concurrency']}")
+    print(f"{'endpoint':<22}{'reqs':>8}{'errs':>6}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'req/s':>9}")
+    for endpoint, stats in report['endpoints'].items():
+        line = (f"{endpoint:<22}{stats['requests']:>8}{stats['errors']:>6}"
+                f"{stats['p50_ms']:>10.1f}{stats['p90_ms']:>10.1f}{stats['p99_ms']:>10.1f}"
+                f"{stats['throughput_rps']:>9.1f}")
+        base = (baseline or {}).get('endpoints', {}).get(endpoint)
+        if base:
+            line += (f"   p50 {stats['p50_ms'] - base['p50_ms']:+.1f}ms"
+                     f" p99 {stats['p99_ms'] - base['p99_ms']:+.1f}ms")
+        print(line)
+
+    pool = report['pool']
+    if pool:
+        print(f"\nDB pool: max {pool['max_checked_out']}/{pool['capacity']} checked out, "
+              f"mean {pool['mean_checked_out']:.1f}, saturated {pool['saturated_fraction']:.0%} of samples")
+    if baseline:
+        print(f"\nCompared with {baseline.get('commit')} from {baseline.get('timestamp')}: "
+              f"throughput {report['throughput_rps'] - baseline['throughput_rps']:+.1f} req/s")
+
+
+def run(args):
+    symbols = [f"{SYMBOL_PREFIX}{i:04d}" for i in range(args.symbols)]
+    recorder = Recorder()
+    pool_samples = []
+    stop = threading.Event()
+
+    poller = threading.Thread(target=poll_pool, args=(args.base_url, pool_samples, stop), daemon=True)
+    poller.start()
+
+    started = time.perf_counter()
+    deadline = time.monotonic() + args.duration
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = [
+            executor.submit(virtual_user, args, symbols, recorder, deadline, args.seed + i)
+            for i in range(args.concurrency)
+        ]
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    poller.join()
+
+    report = summarize(recorder, pool_samples, elapsed, args)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    seed_parser = sub.add_parser('seed', help='Insert synthetic OHLCV history')
+    seed_parser.add_argument('--symbols', type=int, default=300)
+    seed_parser.add_argument('--years', type=int, default=30)
+    seed_parser.add_argument('--seed', type=int, default=42)
+    seed_parser.add_argument('--reset', action='store_true', help='Delete previously seeded symbols first')
+    seed_parser.add_argument('--force', action='store_true', help='Allow seeding a non-loadtest database')
+    seed_parser.set_defaults(func=seed)
+
+    run_parser = sub.add_parser('run', help='Replay the frontend request mix')
+    run_parser.add_argument('--base-url', default='http://localhost:5000')
+    run_parser.add_argument('--symbols', type=int, default=300, help='Number of seeded symbols to draw from')
+    run_parser.add_argument('--concurrency', type=int, default=16)
+    run_parser.add_argument('--duration', type=float, default=60, help='Seconds to run')
+    run_parser.add_argument('--max-page-clicks', type=int, default=3)
+    run_parser.add_argument('--chart-data-ratio', type=float, default=0.25)
+    run_parser.add_argument('--think-time', type=float, default=0.0, help='Mean pause between user flows')
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('--output', help='Write the JSON report here')
+    run_parser.add_argument('--compare', help='Baseline JSON report to diff against')
+    run_parser.set_defaults(func=run)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
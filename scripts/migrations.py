@@ -0,0 +1,36 @@
+import os
+import logging
+
+import psycopg2
+from dotenv import load_dotenv
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'db', 'migrations.sql')
+
+
+def apply_migrations(cur):
+    """Create tables added since db/schema.sql was first applied; safe to rerun"""
+    with open(MIGRATIONS_PATH) as f:
+        cur.execute(f.read())
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    conn = psycopg2.connect(
+        dbname=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT")
+    )
+    cur = conn.cursor()
+    apply_migrations(cur)
+    conn.commit()
+    logger.info(f"Applied {MIGRATIONS_PATH}")
+
+    cur.close()
+    conn.close()
@@ -9,6 +9,11 @@ from datetime import datetime
 from pandas.tseries.offsets import BDay  # Business day offset
 import sys
 import io
+import json
+from gap_index import last_stored_dates, refresh_gap_index, load_gaps, plan_backfill, record_attempt, provider_range
+from trading_calendar import trading_sessions
+from data_quality import ingest_batch
+from migrations import apply_migrations
 
 # Force UTF-8 encoding for stdout
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
@@ -47,12 +52,16 @@ conn = psycopg2.connect(
 )
 cur = conn.cursor()
 
+# Add tables introduced since the database was created, without touching prices
+apply_migrations(cur)
+conn.commit()
+
 # Define stock symbols to track
 stocks = ["AAPL", "GOOGL", "MSFT"]
 
-# Get all latest dates in one query (optimization)
-cur.execute("SELECT symbol, MAX(price_date) FROM prices GROUP BY symbol;")
-last_dates = dict(cur.fetchall())  # Stores latest price_date for each stock
+# Get all latest dates in one query (optimization); quarantined bars count as fetched,
+# future-dated ones do not
+last_dates = last_stored_dates(cur)  # Stores latest price_date for each stock
 
 # Determine today's date (handling market open cases)
 today = datetime.today() #NL time
@@ -61,50 +70,12 @@ if today.hour < 22:  # If it's before market close in New York (22.00 NL time),
     today = today - BDay(1)
 today = today.date()  # Convert to date only
 
-def validate_price_data(row, df, symbol, today):
-    """Validate a single row of price data with yfinance format"""
-    try:
-        date = row.Index.date()
-        if date > today:
-            return False, "Future date"
-        
-        # Extract raw numeric values from the DataFrame
-        values = {
-            'Open': float(df.loc[row.Index, 'Open']),
-            'High': float(df.loc[row.Index, 'High']),
-            'Low': float(df.loc[row.Index, 'Low']),
-            'Close': float(df.loc[row.Index, 'Close']),
-            'Volume': float(df.loc[row.Index, 'Volume'])
-        }
-        
-        # Debug log the actual numeric values
-        log(f"Debug - Row data for {symbol} on {date}:")
-        for field, value in values.items():
-            log(f"  {field}: {value}")
-        
-        # Validate price values
-        for field, value in values.items():
-            if field != 'Volume':
-                if not isinstance(value, (int, float)) or pd.isna(value) or value <= 0:
-                    return False, f"Invalid {field} price: {value}"
-            else:
-                if not isinstance(value, (int, float)) or pd.isna(value) or value < 0:
-                    return False, f"Invalid volume: {value}"
-        
-        return True, values
-        
-    except Exception as e:
-        log(f"Debug - Validation error details: {str(e)}")
-        return False, f"Validation error: {str(e)}"
-
 def log_data_quality(symbol):
     try:
+        # Counters are maintained at ingest time, so this reads one row instead of scanning prices
         cur.execute("""
-            SELECT 
-                COUNT(*) as total_rows,
-                COUNT(*) FILTER (WHERE close_price IS NULL) as null_close,
-                COUNT(*) FILTER (WHERE volume = 0 OR volume IS NULL) as zero_volume
-            FROM prices
+            SELECT accepted_rows, duplicate_rows, rejected_rows, zero_volume, outlier_return
+            FROM data_quality_stats
             WHERE symbol = %s
         """, (symbol,))
         result = cur.fetchone()
@@ -112,6 +83,64 @@ def log_data_quality(symbol):
     except Exception as e:
         log(f"Error logging data quality for {symbol}: {e}")
 
+MAX_RETRIES = 3
+
+def download_prices(symbol, start_date, end_date):
+    """Fetch stock data with retry mechanism to handle API failures"""
+    for attempt in range(MAX_RETRIES):
+        try:
+            df = yf.download(symbol, start=start_date, end=end_date)
+            
+            # Ensure DataFrame has numeric types
+            df = df.astype({
+                'Open': float,
+                'High': float,
+                'Low': float,
+                'Close': float,
+                'Volume': float
+            })
+            
+            # Debug log the DataFrame info
+            log(f"\nDebug - DataFrame info for {symbol}:")
+            log(f"Columns: {df.columns.tolist()}")
+            log(f"Shape: {df.shape}")
+            log(f"Types:\n{df.dtypes}")
+            
+            return df
+        except Exception as e:
+            log(f"⚠️ Attempt {attempt+1} failed for {symbol}: {e}")
+            time.sleep(5)  # Wait 5 seconds before retrying
+
+    log(f"❌ Failed to fetch {symbol} after {MAX_RETRIES} attempts. Skipping...")
+    return None
+
+def insert_prices(symbol, df):
+    """Quality-check and insert downloaded rows, ignoring ones already stored. Returns the number inserted."""
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+
+    try:
+        inserted = ingest_batch(cur, symbol, df, today)
+
+        # Let the backend push the new bars to live chart subscribers
+        for index, row in inserted.iterrows():
+            cur.execute("SELECT pg_notify('price_bars', %s)", (json.dumps({
+                'symbol': symbol,
+                'price_date': index.date().isoformat(),
+                'open': float(row['Open']),
+                'high': float(row['High']),
+                'low': float(row['Low']),
+                'close': float(row['Close']),
+                'volume': int(row['Volume'])
+            }),))
+        conn.commit()
+        return len(inserted)
+
+    except Exception as e:
+        log(f"⚠️ Error inserting {symbol}: {e}")
+        conn.rollback()
+        return 0
+
 for symbol in stocks:
     last_date = last_dates.get(symbol, None)
 
@@ -136,33 +165,8 @@ for symbol in stocks:
 
     log(f"📊 Fetching {symbol} from {start_date} to {today}...")
 
-    # Fetch stock data with retry mechanism to handle API failures
-    MAX_RETRIES = 3
-    for attempt in range(MAX_RETRIES):
-        try:
-            df = yf.download(symbol, start=start_date, end=today)
-            
-            # Ensure DataFrame has numeric types
-            df = df.astype({
-                'Open': float,
-                'High': float,
-                'Low': float,
-                'Close': float,
-                'Volume': float
-            })
-            
-            # Debug log the DataFrame info
-            log(f"\nDebug - DataFrame info for {symbol}:")
-            log(f"Columns: {df.columns.tolist()}")
-            log(f"Shape: {df.shape}")
-            log(f"Types:\n{df.dtypes}")
-            
-            break  # Success, exit retry loop
-        except Exception as e:
-            log(f"⚠️ Attempt {attempt+1} failed for {symbol}: {e}")
-            time.sleep(5)  # Wait 5 seconds before retrying
-    else:
-        log(f"❌ Failed to fetch {symbol} after {MAX_RETRIES} attempts. Skipping...")
+    df = download_prices(symbol, start_date, today)
+    if df is None:
         continue
 
     if df.empty:
@@ -170,36 +174,34 @@ for symbol in stocks:
         continue
 
     # Insert new data into database
-    for row in df.itertuples():
-        try:
-            is_valid, data = validate_price_data(row, df, symbol, today)
-            if not is_valid:
-                if isinstance(data, str):
-                    log(f"⚠️ Skipping invalid data for {symbol} on {row.Index.date()}: {data}")
-                continue
-
-            cur.execute("""
-                INSERT INTO prices (symbol, price_date, open_price, high_price, low_price, close_price, volume, market_source)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, 'stock')
-                ON CONFLICT (symbol, price_date) DO NOTHING
-            """, (
-                symbol,
-                row.Index.date(),
-                data['Open'],
-                data['High'],
-                data['Low'],
-                data['Close'],
-                int(data['Volume'])
-            ))
-            conn.commit()  # Commit each successful insert
-            
-        except Exception as e:
-            log(f"⚠️ Error inserting {symbol} on {row.Index.date()}: {e}")
-            conn.rollback()
-            continue
+    insert_prices(symbol, df)
 
     log_data_quality(symbol)
 
+# Repair holes in the middle of the history using the exchange calendar gap index
+refresh_gap_index(cur, stocks)
+conn.commit()
+
+for symbol in stocks:
+    gaps = load_gaps(cur, symbol)
+    if not gaps:
+        continue
+
+    sessions = trading_sessions('stock', gaps[0][0], gaps[-1][1])
+    plan = plan_backfill(gaps, sessions)
+    log(f"🩹 Backfilling {len(gaps)} gaps for {symbol} in {len(plan)} requests...")
+
+    for gap_start, gap_end in plan:
+        df = download_prices(symbol, *provider_range(gap_start, gap_end))
+        inserted = insert_prices(symbol, df) if df is not None and not df.empty else 0
+        log(f"   {symbol} {gap_start} to {gap_end}: inserted {inserted} rows")
+        record_attempt(cur, symbol, gap_start, gap_end)
+        conn.commit()
+
+# Re-index so filled gaps disappear and unfilled ones keep their attempt count
+refresh_gap_index(cur, stocks)
+conn.commit()
+
 cur.close()
 conn.close()
 log("\n✅ Data updated successfully.")
@@ -0,0 +1,61 @@
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar,
+    Holiday,
+    GoodFriday,
+    USLaborDay,
+    USMemorialDay,
+    USPresidentsDay,
+    USThanksgivingDay,
+    nearest_workday,
+    sunday_to_monday,
+)
+from pandas.tseries.offsets import CustomBusinessDay, DateOffset
+from dateutil.relativedelta import MO
+
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    """Regular full-day NYSE holidays"""
+    rules = [
+        # NYSE does not close on the Friday before a Saturday New Year's Day
+        Holiday('New Years Day', month=1, day=1, observance=sunday_to_monday),
+        Holiday('Martin Luther King Jr. Day', month=1, day=1, start_date='1998-01-01',
+                offset=DateOffset(weekday=MO(3))),
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-01-01', observance=nearest_workday),
+        Holiday('Independence Day', month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas Day', month=12, day=25, observance=nearest_workday),
+    ]
+
+
+# Unscheduled NYSE closures since 1980 that no holiday rule captures
+NYSE_SPECIAL_CLOSURES = pd.to_datetime([
+    '1985-09-27',  # Hurricane Gloria
+    '1994-04-27',  # Nixon funeral
+    '2001-09-11', '2001-09-12', '2001-09-13', '2001-09-14',  # 9/11
+    '2004-06-11',  # Reagan funeral
+    '2007-01-02',  # Ford funeral
+    '2012-10-29', '2012-10-30',  # Hurricane Sandy
+    '2018-12-05',  # G.H.W. Bush funeral
+    '2025-01-09',  # Carter funeral
+])
+
+NYSE_SESSION = CustomBusinessDay(calendar=NYSEHolidayCalendar())
+
+
+def trading_sessions(market_source, start_date, end_date):
+    """Expected trading dates for a market between two dates (inclusive) as datetime64[D].
+
+    Crypto trades every calendar day; anything else follows the NYSE calendar.
+    """
+    if market_source == 'crypto':
+        sessions = pd.date_range(start=start_date, end=end_date, freq='D')
+    else:
+        sessions = pd.date_range(start=start_date, end=end_date, freq=NYSE_SESSION)
+        sessions = sessions[~sessions.isin(NYSE_SPECIAL_CLOSURES)]
+
+    return sessions.values.astype('datetime64[D]')
@@ -1,5 +1,12 @@
 from strategies import RSIStrategy, MACDStrategy
-from flask import Flask, jsonify, abort, request
+from streaming import BarStream, format_sse, sse_heartbeat
+from correlation import load_returns_matrix, correlation_matrix, rolling_correlation, ResultCache, matrix_to_json, pair_indices
+from data_version import get_data_version
+from result_store import BacktestResultStore, make_result_key
+from profiling import init_profiling, profile_stage, is_profiling
+from forecasting import ForecastService, ModelUnavailable
+from risk import simulate_risk, MAX_HORIZON
+from flask import Flask, jsonify, abort, request, Response, stream_with_context
 import pandas as pd
 import os
 import numpy as np
@@ -10,6 +17,9 @@ import logging
 from flask_cors import CORS
 import json
 from decimal import Decimal
+import queue
+import multiprocessing
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
 # Custom JSON encoder for datetime and Decimal
 class CustomJSONEncoder(json.JSONEncoder):
@@ -42,6 +52,13 @@ CORS(app, resources={
 app.config['TIMEOUT'] = 300  # 5 minutes timeout
 app.json_encoder = CustomJSONEncoder
 
+# Opt-in request profiling (?profile=sample|cprofile or X-Profile header), off unless configured
+init_profiling(
+    app,
+    enabled=os.getenv('PROFILING_ENABLED', 'false').lower() == 'true',
+    output_dir=os.getenv('PROFILE_DIR', 'profiles')
+)
+
 # Test endpoint to verify API is working
 @app.route('/api/test')
 def test_api():
@@ -53,7 +70,26 @@ def test_api():
 
 # Configure PostgreSQL connection
 DB_URI = f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
-engine = create_engine(DB_URI)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+engine = create_engine(DB_URI, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+
+# Connection pool usage, polled by scripts/load_test.py to spot pool saturation; off unless configured
+POOL_STATUS_ENABLED = os.getenv('POOL_STATUS_ENABLED', 'false').lower() == 'true'
+
+@app.route('/api/pool_status')
+def get_pool_status():
+    if not POOL_STATUS_ENABLED:
+        abort(404)
+    pool = engine.pool
+    return jsonify({
+        'size': pool.size(),
+        'checked_out': pool.checkedout(),
+        'checked_in': pool.checkedin(),
+        'overflow': pool.overflow(),
+        'max_overflow': DB_MAX_OVERFLOW,
+        'timestamp': datetime.now().isoformat()
+    })
 
 def fetch_data(symbol, days=252):
     """Fetch historical data from PostgreSQL"""
@@ -260,12 +296,14 @@ def get_strategy_data():
             return jsonify({"error": "Missing required parameters"}), 400
 
         # Fetch historical data
-        df, _ = fetch_data(symbol)
+        with profile_stage('fetch_data'):
+            df, _ = fetch_data(symbol)
         
         # Calculate strategy indicators
         if strategy == 'RSI':
             strategy_obj = RSIStrategy()
-            df = strategy_obj.calculate_indicators(df)
+            with profile_stage('calculate_indicators'):
+                df = strategy_obj.calculate_indicators(df)
             
             return jsonify({
                 'dates': df.index.strftime('%Y-%m-%d').tolist(),
@@ -277,7 +315,8 @@ def get_strategy_data():
             
         elif strategy == 'MACD':
             strategy_obj = MACDStrategy()
-            df = strategy_obj.calculate_indicators(df)
+            with profile_stage('calculate_indicators'):
+                df = strategy_obj.calculate_indicators(df)
             
             return jsonify({
                 'dates': df.index.strftime('%Y-%m-%d').tolist(),
@@ -293,6 +332,106 @@ def get_strategy_data():
         logger.error(f"Error in get_strategy_data: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+def run_backtest(df, symbol, strategy):
+    """Replay indicator signals into a trade ledger, daily equity curve and summary metrics"""
+    trades_list = []
+    positions = np.zeros(len(df))
+    current_position = None
+    entry_price = None
+    entry_date = None
+
+    for i, (index, row) in enumerate(df.iterrows()):
+        if 'RSI' in df.columns:
+            # RSI strategy signals
+            signal = 1 if row['RSI'] < 30 else -1 if row['RSI'] > 70 else 0
+        else:
+            # MACD strategy signals
+            signal = 1 if row['MACD'] > row['Signal'] else -1 if row['MACD'] < row['Signal'] else 0
+
+        if signal != 0 and current_position is None:
+            # Enter position
+            current_position = signal
+            entry_price = row['Close']
+            entry_date = index
+        elif current_position is not None and (signal == -current_position or signal == 0):
+            # Exit position
+            exit_price = row['Close']
+            return_value = (exit_price - entry_price) / entry_price * current_position
+            
+            trades_list.append({
+                'signal': current_position,
+                'entry_price': float(entry_price),
+                'exit_price': float(exit_price),
+                'return': float(return_value),
+                'created_date': entry_date.isoformat(),
+                'exit_date': index.isoformat()
+            })
+            
+            current_position = None
+            entry_price = None
+            entry_date = None
+
+        positions[i] = current_position or 0
+
+    # Position taken at today's close earns tomorrow's return
+    daily_returns = df['Daily_Return'].to_numpy()
+    strategy_returns = np.r_[0.0, positions[:-1]] * daily_returns
+    equity = np.cumprod(1 + strategy_returns)
+
+    # Calculate metrics
+    total_trades = len(trades_list)
+    if trades_list:
+        total_return = sum(trade['return'] for trade in trades_list)
+        winning_trades = sum(1 for trade in trades_list if trade['return'] > 0)
+        win_rate = winning_trades / total_trades
+        max_drawdown = min(trade['return'] for trade in trades_list)
+    else:
+        total_return = win_rate = max_drawdown = 0
+
+    return {
+        'trades': trades_list,
+        'equity_dates': df.index.strftime('%Y-%m-%d').tolist(),
+        'equity': equity.tolist(),
+        'metrics': {
+            'total_return': total_return,
+            'win_rate': win_rate,
+            'max_drawdown': max_drawdown,
+            'sharpe_ratio': 0,  # Calculate if needed
+            'trades': total_trades,
+            'avg_return_per_trade': total_return / total_trades if total_trades > 0 else 0
+        }
+    }
+
+# Backtest results survive restarts and are shared across workers
+result_store = BacktestResultStore(
+    engine,
+    max_age_days=int(os.getenv('RESULT_STORE_MAX_AGE_DAYS', 30)),
+    max_total_bytes=int(os.getenv('RESULT_STORE_MAX_BYTES', 500 * 1024 * 1024)),
+    keep_versions=int(os.getenv('RESULT_STORE_KEEP_VERSIONS', 1))
+)
+
+def get_backtest_result(symbol, strategy_obj, strategy, days=252):
+    """Load a backtest from the result store, computing and saving it on a miss"""
+    # fetch_data looks back from today, so the window end is part of the identity
+    data_version = get_data_version(engine, [symbol])
+    result_key = make_result_key(strategy_obj, symbol, data_version,
+                                 days=days, as_of=datetime.now().date().isoformat())
+    # A profiled request always recomputes so the profile shows the real work
+    result = None if is_profiling() else result_store.load(result_key)
+    cached = result is not None
+
+    if not cached:
+        # Fetch historical data and calculate strategy indicators
+        with profile_stage('fetch_data'):
+            df, _ = fetch_data(symbol, days=days)
+        with profile_stage('calculate_indicators'):
+            df = strategy_obj.calculate_indicators(df)
+        with profile_stage('trade_loop'):
+            result = run_backtest(df, symbol, strategy)
+        result_store.save(result_key, strategy_obj, symbol, data_version, result)
+
+    return result, result_key, cached
+
 # Add trades endpoint
 @app.route('/api/trades')
 def get_trades_data():
@@ -304,56 +443,19 @@ def get_trades_data():
 
         logger.info(f"Received trades request: {symbol}, {strategy}, page={page}")
 
-        # Fetch historical data and calculate strategy indicators
-        df, _ = fetch_data(symbol)
-        
         if strategy == 'RSI':
             strategy_obj = RSIStrategy()
-            df = strategy_obj.calculate_indicators(df)
         elif strategy == 'MACD':
             strategy_obj = MACDStrategy()
-            df = strategy_obj.calculate_indicators(df)
         else:
             return jsonify({"error": "Invalid strategy"}), 400
 
-        # Generate trades from signals
-        trades_list = []
-        current_position = None
-        entry_price = None
-        entry_date = None
-
-        for index, row in df.iterrows():
-            if 'RSI' in df.columns:
-                # RSI strategy signals
-                signal = 1 if row['RSI'] < 30 else -1 if row['RSI'] > 70 else 0
-            else:
-                # MACD strategy signals
-                signal = 1 if row['MACD'] > row['Signal'] else -1 if row['MACD'] < row['Signal'] else 0
-
-            if signal != 0 and current_position is None:
-                # Enter position
-                current_position = signal
-                entry_price = row['Close']
-                entry_date = index
-            elif current_position is not None and (signal == -current_position or signal == 0):
-                # Exit position
-                exit_price = row['Close']
-                return_value = (exit_price - entry_price) / entry_price * current_position
-                
-                trades_list.append({
-                    'id': len(trades_list) + 1,
-                    'symbol': symbol,
-                    'strategy': strategy,
-                    'signal': current_position,
-                    'entry_price': float(entry_price),
-                    'exit_price': float(exit_price),
-                    'return': float(return_value),
-                    'created_date': entry_date.isoformat()
-                })
-                
-                current_position = None
-                entry_price = None
-                entry_date = None
+        result, result_key, cached = get_backtest_result(symbol, strategy_obj, strategy)
+
+        trades_list = [
+            {'id': i + 1, 'symbol': symbol, 'strategy': strategy, **trade}
+            for i, trade in enumerate(result['trades'])
+        ]
 
         # Calculate total number of trades
         total_trades = len(trades_list)
@@ -363,29 +465,15 @@ def get_trades_data():
         end_idx = start_idx + per_page
         paginated_trades = trades_list[start_idx:end_idx]
 
-        # Calculate metrics
-        if trades_list:
-            total_return = sum(trade['return'] for trade in trades_list)
-            winning_trades = sum(1 for trade in trades_list if trade['return'] > 0)
-            win_rate = winning_trades / total_trades
-            max_drawdown = min(trade['return'] for trade in trades_list)
-        else:
-            total_return = win_rate = max_drawdown = 0
-
         response = {
             'trades': paginated_trades,
             'total': total_trades,
             'page': page,
             'per_page': per_page,
             'pages': (total_trades + per_page - 1) // per_page,
-            'metrics': {
-                'total_return': total_return,
-                'win_rate': win_rate,
-                'max_drawdown': max_drawdown,
-                'sharpe_ratio': 0,  # Calculate if needed
-                'trades': total_trades,
-                'avg_return_per_trade': total_return / total_trades if total_trades > 0 else 0
-            },
+            'metrics': result['metrics'],
+            'result_key': result_key,
+            'cached': cached,
             'timestamp': datetime.now().isoformat()
         }
 
@@ -396,6 +484,267 @@ def get_trades_data():
         logger.error(f"Error in get_trades_data: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/risk')
+def get_risk():
+    """Bootstrap / Monte Carlo confidence intervals for a strategy's daily returns"""
+    try:
+        symbol = request.args.get('symbol')
+        strategy = request.args.get('strategy')
+        method = request.args.get('method', 'bootstrap')
+        n_paths = request.args.get('n_paths', 10000, type=int)
+        horizon = request.args.get('horizon', type=int)
+        block_size = request.args.get('block_size', 10, type=int)
+        confidence = request.args.get('confidence', 0.95, type=float)
+        seed = request.args.get('seed', 42, type=int)
+
+        logger.info(f"Received risk request: {symbol}, {strategy}, {method}, n_paths={n_paths}")
+
+        if not symbol:
+            return jsonify({"error": "Missing required parameters"}), 400
+        if strategy == 'RSI':
+            strategy_obj = RSIStrategy()
+        elif strategy == 'MACD':
+            strategy_obj = MACDStrategy()
+        else:
+            return jsonify({"error": "Invalid strategy"}), 400
+        if not 100 <= n_paths <= 1_000_000:
+            return jsonify({"error": "n_paths must be between 100 and 1000000"}), 400
+        if horizon is not None and not 1 <= horizon <= MAX_HORIZON:
+            return jsonify({"error": f"horizon must be between 1 and {MAX_HORIZON}"}), 400
+
+        result, result_key, _ = get_backtest_result(symbol, strategy_obj, strategy)
+        equity = np.asarray(result['equity'])
+        daily_returns = equity[1:] / equity[:-1] - 1
+
+        risk = simulate_risk(
+            daily_returns,
+            n_paths=n_paths,
+            horizon=horizon,
+            method=method,
+            block_size=block_size,
+            confidence=confidence,
+            seed=seed
+        )
+
+        return jsonify({
+            'symbol': symbol,
+            'strategy': strategy,
+            'result_key': result_key,
+            **risk,
+            'timestamp': datetime.now().isoformat()
+        })
+
+    except ValueError as e:
+        logger.error(f"Invalid risk request: {str(e)}")
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in get_risk: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+# LSTM forecasts: TensorFlow is imported on first use, not at worker startup
+forecast_service = ForecastService(
+    os.getenv('FORECAST_MODEL_PATH', 'models/lstm.keras'),
+    window=int(os.getenv('FORECAST_WINDOW', 30)),
+    max_batch_size=int(os.getenv('FORECAST_MAX_BATCH_SIZE', 64)),
+    max_latency_ms=float(os.getenv('FORECAST_MAX_LATENCY_MS', 10))
+)
+# Risk simulation workers are spawned and re-import this module; they never forecast
+if os.getenv('FORECAST_WARMUP', 'false').lower() == 'true' and multiprocessing.parent_process() is None:
+    forecast_service.warm_up()
+
+@app.route('/api/forecast')
+def get_forecast():
+    try:
+        symbol = request.args.get('symbol')
+        steps = request.args.get('steps', 1, type=int)
+
+        logger.info(f"Received forecast request: {symbol}, steps={steps}")
+
+        if not symbol:
+            return jsonify({"error": "Missing required parameters"}), 400
+        if not 1 <= steps <= 10:
+            return jsonify({"error": "steps must be between 1 and 10"}), 400
+
+        df, _ = fetch_data(symbol)
+        closes = df['Close'].to_numpy(dtype=np.float32)
+
+        # Multi-step forecasts feed each prediction back in as the newest close
+        forecasts = []
+        for _ in range(steps):
+            forecasts.append(forecast_service.predict(closes))
+            closes = np.append(closes[1:], np.float32(forecasts[-1]))
+
+        return jsonify({
+            'symbol': symbol,
+            'last_date': df.index[-1].strftime('%Y-%m-%d'),
+            'last_close': float(df['Close'].iloc[-1]),
+            'forecast': forecasts,
+            'timestamp': datetime.now().isoformat()
+        })
+
+    except ModelUnavailable as e:
+        logger.error(f"Forecast model unavailable: {str(e)}")
+        return jsonify({"error": str(e)}), 503
+    except FutureTimeoutError:
+        logger.error(f"Forecast for {symbol} timed out")
+        return jsonify({"error": "Forecast timed out"}), 504
+    except ValueError as e:
+        logger.error(f"Invalid forecast request: {str(e)}")
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in get_forecast: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/forecast_stats')
+def get_forecast_stats():
+    return jsonify(forecast_service.stats())
+
+# Live bar stream shared by all SSE clients in this process
+bar_stream = BarStream(fetch_data)
+STREAM_HEARTBEAT_SECONDS = 15
+
+@app.route('/api/stream/strategy_data')
+def stream_strategy_data():
+    """Push each newly arrived bar with its indicator values as Server-Sent Events"""
+    symbol = request.args.get('symbol')
+    strategy = request.args.get('strategy')
+
+    if not all([symbol, strategy]):
+        return jsonify({"error": "Missing required parameters"}), 400
+    if strategy not in ['RSI', 'MACD']:
+        return jsonify({"error": "Invalid strategy"}), 400
+
+    simulated = [s.strip() for s in os.getenv('STREAM_SIMULATED_SYMBOLS', '').split(',') if s.strip()]
+    bar_stream.start(
+        engine,
+        simulate_symbols=simulated,
+        simulate_interval=float(os.getenv('STREAM_SIMULATED_INTERVAL', 5))
+    )
+
+    try:
+        client = bar_stream.subscribe(symbol, strategy)
+    except Exception as e:
+        logger.error(f"Error subscribing to stream for {symbol} {strategy}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+    def generate():
+        try:
+            yield format_sse({'symbol': symbol, 'strategy': strategy}, event='subscribed')
+            while True:
+                try:
+                    message = client.get(timeout=STREAM_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield sse_heartbeat()
+                    continue
+                if message is None:
+                    break
+                yield format_sse(message, event='bar')
+        finally:
+            bar_stream.unsubscribe(symbol, strategy, client)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+# Correlation results are reused until the underlying prices change; the
+# serialized responses are cached, bounded by total size
+correlation_cache = ResultCache(max_entries=32, max_bytes=int(os.getenv('CORRELATION_CACHE_MB', '256')) * 1024 * 1024)
+MAX_CORRELATION_SYMBOLS = 500
+# Rolling values (windows x pairs x 2 matrices) one response may carry
+MAX_ROLLING_VALUES = 2_000_000
+# Above this many symbols rolling output is only included when asked for
+# (rolling=true or pairs); 20 symbols is 190 pairs, about 10 years at step=1
+ROLLING_DEFAULT_MAX_SYMBOLS = 20
+
+@app.route('/api/correlation')
+def get_correlation():
+    """Full correlation/covariance matrices plus rolling pair series for an aligned set of symbols.
+
+    Rolling output covers every pair in the upper triangle (or only `pairs`,
+    e.g. AAPL:MSFT,AAPL:GOOGL) as one row per window. step defaults to 1,
+    which uses the incremental window update. Rolling output is on by default
+    for small universes or when pairs are given, so a plain large-universe
+    request returns just the full-sample matrices.
+    """
+    try:
+        symbols = [s.strip() for s in request.args.get('symbols', '').split(',') if s.strip()]
+        window = request.args.get('window', 60, type=int)
+        step = request.args.get('step', 1, type=int)
+        pairs = [p.strip() for p in request.args.get('pairs', '').split(',') if p.strip()] or None
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        rolling_param = request.args.get('rolling')
+        if rolling_param is None:
+            include_rolling = pairs is not None or len(symbols) <= ROLLING_DEFAULT_MAX_SYMBOLS
+        else:
+            include_rolling = rolling_param.lower() == 'true'
+
+        logger.info(f"Received correlation request: {len(symbols)} symbols, window={window}, step={step}")
+
+        if len(symbols) < 2:
+            return jsonify({"error": "At least two symbols are required"}), 400
+        if len(symbols) > MAX_CORRELATION_SYMBOLS:
+            return jsonify({"error": f"At most {MAX_CORRELATION_SYMBOLS} symbols are supported"}), 400
+        if len(set(symbols)) != len(symbols):
+            return jsonify({"error": "Duplicate symbols"}), 400
+        rows, cols = pair_indices(symbols, pairs)
+
+        version = get_data_version(engine, symbols)
+        key = (tuple(symbols), window, step, tuple(pairs or ()), start_date, end_date, include_rolling, version)
+        cached = correlation_cache.get(key)
+        if cached is not None:
+            logger.info("Returning cached correlation result")
+            return Response(cached, mimetype='application/json')
+
+        returns = load_returns_matrix(engine, symbols, start_date, end_date)
+        cov, corr = correlation_matrix(returns.values)
+        dates = returns.index.strftime('%Y-%m-%d')
+
+        response = {
+            'symbols': symbols,
+            'observations': len(returns),
+            'date_range': f"{dates[0]} to {dates[-1]}",
+            'data_version': version,
+            'correlation': matrix_to_json(corr),
+            'covariance': matrix_to_json(cov, decimals=10)
+        }
+
+        if include_rolling:
+            n_windows = max(0, (len(returns) - window) // max(step, 1) + 1)
+            if n_windows * len(rows) * 2 > MAX_ROLLING_VALUES:
+                return jsonify({
+                    "error": f"Rolling output of {n_windows} windows x {len(rows)} pairs exceeds "
+                             f"{MAX_ROLLING_VALUES} values; pass pairs, a larger step or rolling=false"
+                }), 400
+
+            rolling_dates, rolling_corr, rolling_cov = [], [], []
+            for end_idx, window_cov, window_corr in rolling_correlation(returns.values, window, step):
+                rolling_dates.append(dates[end_idx])
+                rolling_corr.append(window_corr[rows, cols])
+                rolling_cov.append(window_cov[rows, cols])
+
+            response['rolling'] = {
+                'window': window,
+                'step': step,
+                'dates': rolling_dates,
+                'pairs': [f"{symbols[i]}:{symbols[j]}" for i, j in zip(rows, cols)],
+                'correlation': matrix_to_json(np.array(rolling_corr).reshape(-1, len(rows))),
+                'covariance': matrix_to_json(np.array(rolling_cov).reshape(-1, len(rows)), decimals=10)
+            }
+
+        body = json.dumps(response)
+        correlation_cache.put(key, body, nbytes=len(body))
+        return Response(body, mimetype='application/json')
+
+    except ValueError as e:
+        logger.error(f"Invalid correlation request: {str(e)}")
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in get_correlation: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 if __name__ == '__main__':
     with engine.connect() as conn:
         conn.execute(text("""
@@ -408,5 +757,8 @@ if __name__ == '__main__':
             )
         """))
         conn.commit()
+
+    result_store.ensure_schema()
+    result_store.collect_garbage()
     
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,177 @@
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text, bindparam
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def load_returns_matrix(engine, symbols, start_date=None, end_date=None):
+    """Load closes for symbols and return an aligned (dates x symbols) daily returns frame.
+
+    Only dates on which every symbol traded are kept, so each row is a full
+    cross-section and the matrix can be handed straight to NumPy.
+    """
+    query = text("""
+        SELECT symbol, price_date, close_price
+        FROM prices
+        WHERE symbol IN :symbols
+        AND price_date BETWEEN :start_date AND :end_date
+        AND price_date <= CURRENT_DATE
+        ORDER BY price_date
+    """).bindparams(bindparam('symbols', expanding=True))
+
+    df = pd.read_sql_query(
+        query,
+        engine,
+        params={
+            'symbols': list(symbols),
+            'start_date': start_date or '1900-01-01',
+            'end_date': end_date or '9999-12-31'
+        },
+        parse_dates=['price_date']
+    )
+
+    if df.empty:
+        raise ValueError(f"No data available for {symbols}")
+
+    closes = df.pivot(index='price_date', columns='symbol', values='close_price').astype(float)
+    missing = [s for s in symbols if s not in closes.columns]
+    if missing:
+        raise ValueError(f"No data available for {missing}")
+
+    closes = closes[list(symbols)].dropna()
+    returns = closes.pct_change().iloc[1:]
+
+    logger.info(f"Aligned returns matrix: {returns.shape[0]} dates x {returns.shape[1]} symbols")
+    return returns
+
+
+def _cov_to_corr(cov):
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = cov / np.outer(std, std)
+    np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+    return corr
+
+
+def correlation_matrix(returns):
+    """Full-sample covariance and correlation of a (T x N) returns array"""
+    x = np.asarray(returns, dtype=np.float64)
+    if x.shape[0] < 2:
+        raise ValueError("At least two observations are required")
+
+    centered = x - x.mean(axis=0)
+    cov = centered.T @ centered / (x.shape[0] - 1)
+    return cov, _cov_to_corr(cov)
+
+
+def rolling_correlation(returns, window, step=1):
+    """Yield (end_index, cov, corr) for each rolling window ending every `step` rows.
+
+    Instead of recomputing X.T @ X for every window, running column sums and the
+    cross-product matrix are updated with the rows entering and leaving the
+    window, which costs O(step * N^2) per output rather than O(window * N^2).
+    The sums are rebuilt from scratch every `window` rows to bound drift.
+    """
+    x = np.asarray(returns, dtype=np.float64)
+    n_obs = x.shape[0]
+    if window < 2:
+        raise ValueError("Window must be at least 2")
+    if step < 1:
+        raise ValueError("Step must be at least 1")
+    if n_obs < window:
+        raise ValueError(f"Need at least {window} observations, got {n_obs}")
+
+    # Centering on the full-sample mean keeps the running sums small and well conditioned
+    x = x - x.mean(axis=0)
+
+    end = window
+    block = x[:end]
+    sums = block.sum(axis=0)
+    cross = block.T @ block
+    since_rebuild = 0
+
+    while True:
+        mean = sums / window
+        cov = (cross - window * np.outer(mean, mean)) / (window - 1)
+        yield end - 1, cov, _cov_to_corr(cov)
+
+        next_end = end + step
+        if next_end > n_obs:
+            break
+
+        since_rebuild += step
+        if step >= window or since_rebuild >= window:
+            block = x[next_end - window:next_end]
+            sums = block.sum(axis=0)
+            cross = block.T @ block
+            since_rebuild = 0
+        else:
+            added = x[end:next_end]
+            removed = x[end - window:next_end - window]
+            sums += added.sum(axis=0) - removed.sum(axis=0)
+            cross += added.T @ added - removed.T @ removed
+
+        end = next_end
+
+
+class ResultCache:
+    """Small thread-safe LRU cache for derived results keyed by data version.
+
+    Bounded by entry count and, when max_bytes is set, by the total size the
+    caller reports for each value.
+    """
+
+    def __init__(self, max_entries=32, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+
+    def put(self, key, value, nbytes=0):
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            return  # Would evict everything else and still not fit
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (value, nbytes)
+            self.total_bytes += nbytes
+            while len(self.entries) > self.max_entries or (
+                    self.max_bytes is not None and self.total_bytes > self.max_bytes):
+                self.total_bytes -= self.entries.popitem(last=False)[1][1]
+
+
+def pair_indices(symbols, pairs=None):
+    """Row/column indices for 'A:B' pairs, or every pair in the upper triangle"""
+    if pairs is None:
+        return np.triu_indices(len(symbols), k=1)
+
+    position = {symbol: i for i, symbol in enumerate(symbols)}
+    rows, cols = [], []
+    for pair in pairs:
+        a, _, b = pair.partition(':')
+        if a not in position or b not in position or a == b:
+            raise ValueError(f"Invalid pair: {pair}")
+        rows.append(position[a])
+        cols.append(position[b])
+    return np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)
+
+
+def matrix_to_json(matrix, decimals=6):
+    """Convert a float matrix to nested lists with NaN mapped to None"""
+    rounded = np.round(matrix, decimals).astype(object)
+    rounded[~np.isfinite(matrix)] = None
+    return rounded.tolist()
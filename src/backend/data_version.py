@@ -0,0 +1,35 @@
+import hashlib
+import logging
+
+from sqlalchemy import text, bindparam
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def get_data_version(engine, symbols):
+    """Fingerprint the stored prices for symbols so derived results can be cached.
+
+    Any insert, delete or backfill changes the row count or date bounds of at
+    least one symbol, which changes the returned version string.
+    """
+    try:
+        query = text("""
+            SELECT symbol, COUNT(*), MIN(price_date), MAX(price_date)
+            FROM prices
+            WHERE symbol IN :symbols
+            GROUP BY symbol
+            ORDER BY symbol
+        """).bindparams(bindparam('symbols', expanding=True))
+
+        with engine.connect() as conn:
+            rows = conn.execute(query, {'symbols': list(symbols)}).fetchall()
+
+        digest = hashlib.sha1()
+        for symbol, count, first_date, last_date in rows:
+            digest.update(f"{symbol}|{count}|{first_date}|{last_date};".encode())
+        return digest.hexdigest()
+
+    except Exception as e:
+        logger.error(f"Error computing data version for {symbols}: {str(e)}")
+        raise
@@ -0,0 +1,194 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Recipe file saved next to the model by src/ml/dataset.save_model
+SPEC_SUFFIX = '.spec.json'
+SERVABLE_FEATURES = ('close', 'return')
+# 'symbol' normalization needs training-set statistics the spec does not carry
+SERVABLE_NORMALIZATIONS = (None, 'window')
+
+
+class ModelUnavailable(Exception):
+    pass
+
+
+class ForecastService:
+    """Serve LSTM forecasts from one warm model per process with request micro-batching.
+
+    TensorFlow is imported only when the model is first needed, so workers
+    that never forecast do not pay its startup cost. Concurrent requests,
+    for any symbols, are queued and run through the model together: a batch
+    is dispatched when it reaches max_batch_size or when its oldest request
+    has waited max_latency_ms. Inputs are built with the feature and
+    normalization recorded in the model's spec file, so they match training.
+    """
+
+    def __init__(self, model_path, window=30, max_batch_size=64, max_latency_ms=10, stats_size=1000):
+        self.model_path = model_path
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+        self.model = None
+        self.spec = None
+        self.load_lock = threading.Lock()
+        self.requests = queue.Queue()
+        self.worker = None
+
+        self.stats_lock = threading.Lock()
+        self.batch_sizes = deque(maxlen=stats_size)
+        self.latencies = deque(maxlen=stats_size)
+        self.inference_times = deque(maxlen=stats_size)
+        self.total_requests = 0
+        self.total_batches = 0
+
+    def load(self):
+        """Import TensorFlow and load the saved model once per process"""
+        if self.model is not None:
+            return self.model
+
+        with self.load_lock:
+            if self.model is None:
+                if not self.model_path or not os.path.exists(self.model_path):
+                    raise ModelUnavailable(f"No forecast model found at {self.model_path!r}")
+                self.spec = self.load_spec()
+
+                started = time.perf_counter()
+                import tensorflow as tf  # deferred: adds seconds to worker startup
+
+                model = tf.keras.models.load_model(self.model_path, compile=False)
+                # Trace once so the first real batch does not pay graph construction
+                model(np.zeros((1, self.window, 1), dtype=np.float32), training=False)
+                self.model = model
+                logger.info(f"Loaded forecast model {self.model_path} in {time.perf_counter() - started:.1f}s")
+
+                self.worker = threading.Thread(target=self._run_batches, daemon=True)
+                self.worker.start()
+        return self.model
+
+    def load_spec(self):
+        """Read and check the dataset recipe the model was trained with"""
+        spec_path = self.model_path + SPEC_SUFFIX
+        if not os.path.exists(spec_path):
+            raise ModelUnavailable(f"No training spec found at {spec_path!r}; save models with src/ml/dataset.save_model")
+        with open(spec_path) as f:
+            spec = json.load(f)
+
+        if spec.get('feature') not in SERVABLE_FEATURES:
+            raise ModelUnavailable(f"Unsupported model feature: {spec.get('feature')!r}")
+        if spec.get('normalization') not in SERVABLE_NORMALIZATIONS:
+            raise ModelUnavailable(f"Unsupported model normalization: {spec.get('normalization')!r}")
+        if spec.get('window') != self.window:
+            raise ModelUnavailable(f"Model was trained on windows of {spec.get('window')}, service uses {self.window}")
+        if spec.get('horizon', 1) != 1:
+            raise ModelUnavailable(f"Model forecasts {spec.get('horizon')} steps ahead, only 1 is supported")
+        return spec
+
+    def warm_up(self):
+        """Load the model in the background so the first request is fast"""
+        def run():
+            try:
+                self.load()
+            except Exception as e:
+                logger.error(f"Forecast model warm-up failed: {str(e)}")
+        threading.Thread(target=run, daemon=True).start()
+
+    def predict(self, closes, timeout=5.0):
+        """Forecast the next close from the most recent closes"""
+        self.load()
+
+        # Same inputs the training pipeline builds (src/ml/dataset.py)
+        returns = self.spec['feature'] == 'return'
+        needed = self.window + 1 if returns else self.window
+        closes = np.asarray(closes, dtype=np.float32)[-needed:]
+        if len(closes) < needed:
+            raise ValueError(f"At least {needed} closes are required")
+        series = np.diff(closes) / closes[:-1] if returns else closes
+
+        mean, std = 0.0, 1.0
+        if self.spec['normalization'] == 'window':
+            mean = series.mean()
+            std = series.std() or 1.0
+        future = Future()
+        self.requests.put(((series - mean) / std, future, time.perf_counter()))
+
+        prediction = future.result(timeout=timeout) * std + mean
+        return float(closes[-1] * (1 + prediction)) if returns else float(prediction)
+
+    def _run_batches(self):
+        while True:
+            first = self.requests.get()
+            batch = [first]
+            deadline = first[2] + self.max_latency
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            inputs = np.stack([item[0] for item in batch])[..., np.newaxis]
+            started = time.perf_counter()
+            try:
+                outputs = np.asarray(self.model(inputs, training=False)).reshape(len(batch), -1)[:, 0]
+            except Exception as e:
+                logger.error(f"Forecast batch of {len(batch)} failed: {str(e)}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            finished = time.perf_counter()
+            for (_, future, queued_at), output in zip(batch, outputs):
+                future.set_result(float(output))
+
+            with self.stats_lock:
+                self.total_batches += 1
+                self.total_requests += len(batch)
+                self.batch_sizes.append(len(batch))
+                self.inference_times.append(finished - started)
+                self.latencies.extend(finished - queued_at for _, _, queued_at in batch)
+
+    def stats(self):
+        with self.stats_lock:
+            batch_sizes = np.array(self.batch_sizes)
+            latencies = np.array(self.latencies) * 1000
+            inference = np.array(self.inference_times) * 1000
+
+        def percentiles(values):
+            if not len(values):
+                return None
+            return {
+                'mean': float(values.mean()),
+                'p50': float(np.percentile(values, 50)),
+                'p99': float(np.percentile(values, 99)),
+                'max': float(values.max())
+            }
+
+        return {
+            'model_loaded': self.model is not None,
+            'model_path': self.model_path,
+            'window': self.window,
+            'feature': self.spec['feature'] if self.spec else None,
+            'normalization': self.spec['normalization'] if self.spec else None,
+            'max_batch_size': self.max_batch_size,
+            'max_latency_ms': self.max_latency * 1000,
+            'total_requests': self.total_requests,
+            'total_batches': self.total_batches,
+            'queued': self.requests.qsize(),
+            'batch_size': percentiles(batch_sizes),
+            'latency_ms': percentiles(latencies),
+            'inference_ms': percentiles(inference)
+        }
@@ -0,0 +1,231 @@
+import cProfile
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from flask import request, abort, send_from_directory
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_MODES = ('sample', 'cprofile')
+
+# Profiling session of the request running on this thread, if any
+_local = threading.local()
+# tracemalloc is process-wide and only one cProfile may be active at a time
+# (Python 3.12+), so at most one request is profiled at once
+_active = threading.Lock()
+
+
+class SamplingProfiler:
+    """Periodically capture one thread's stack and count folded stacks.
+
+    Output is the "folded" format (`root;child;leaf count` per line) read by
+    flamegraph.pl, speedscope and most flamegraph viewers.
+    """
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+
+    def _run(self):
+        while self.running:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(names))] += 1
+            time.sleep(self.interval)
+
+    def folded(self):
+        return '\n'.join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + '\n'
+
+
+class ProfileSession:
+    """Profiler and allocation stages for a single request"""
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.profile_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.stages = []
+        self.started_at = time.perf_counter()
+        if mode == 'cprofile':
+            self.profiler = cProfile.Profile()
+        else:
+            self.profiler = SamplingProfiler(threading.get_ident())
+
+    def start(self):
+        tracemalloc.start()
+        if self.mode == 'cprofile':
+            self.profiler.enable()
+        else:
+            self.profiler.start()
+
+    def stop(self):
+        if self.mode == 'cprofile':
+            self.profiler.disable()
+        else:
+            self.profiler.stop()
+        self.elapsed = time.perf_counter() - self.started_at
+        self.current_bytes, self.peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    def save(self, output_dir, endpoint):
+        os.makedirs(output_dir, exist_ok=True)
+        base = os.path.join(output_dir, self.profile_id)
+
+        if self.mode == 'cprofile':
+            self.profiler.dump_stats(f"{base}.prof")
+        else:
+            with open(f"{base}.folded", 'w') as f:
+                f.write(self.profiler.folded())
+
+        with open(f"{base}.alloc.json", 'w') as f:
+            json.dump({
+                'endpoint': endpoint,
+                'mode': self.mode,
+                'elapsed_seconds': self.elapsed,
+                'request_peak_bytes': self.peak_bytes,
+                'stages': self.stages
+            }, f, indent=2)
+
+
+def current_session():
+    return getattr(_local, 'session', None)
+
+
+def is_profiling():
+    return current_session() is not None
+
+
+@contextmanager
+def profile_stage(name, top=10):
+    """Record time and allocation peak of a block when the request is being profiled.
+
+    A no-op outside profiled requests. Stages must not be nested because each
+    one resets the tracemalloc peak.
+    """
+    session = current_session()
+    if session is None:
+        yield
+        return
+
+    tracemalloc.reset_peak()
+    start_current, _ = tracemalloc.get_traced_memory()
+    before = tracemalloc.take_snapshot()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        end_current, peak = tracemalloc.get_traced_memory()
+        diff = tracemalloc.take_snapshot().compare_to(before, 'lineno')
+        session.stages.append({
+            'stage': name,
+            'seconds': elapsed,
+            'peak_bytes': peak - start_current,
+            'net_bytes': end_current - start_current,
+            'top_allocations': [
+                {'location': str(stat.traceback[0]), 'size_diff_bytes': stat.size_diff, 'count_diff': stat.count_diff}
+                for stat in diff[:top]
+            ]
+        })
+
+
+def init_profiling(app, enabled=False, output_dir='profiles'):
+    """Enable opt-in per-request profiling via `?profile=` or the X-Profile header.
+
+    Requests only get profiled when `enabled` is set; otherwise the parameter
+    is ignored. Only one request is profiled at a time; a profile request
+    arriving while another runs gets a 409. Profiles are written to
+    output_dir and served from /api/profiles/<profile_id>.
+    """
+    output_dir = os.path.abspath(output_dir)
+
+    @app.before_request
+    def start_profile():
+        mode = request.args.get('profile') or request.headers.get(PROFILE_HEADER)
+        if not mode:
+            return
+        if not enabled:
+            logger.warning(f"Ignoring profile request for {request.path}: profiling is disabled")
+            return
+
+        if not _active.acquire(blocking=False):
+            logger.warning(f"Rejecting profile request for {request.path}: another request is being profiled")
+            return {"error": "Another request is being profiled, retry shortly"}, 409
+
+        mode = mode if mode in PROFILE_MODES else 'sample'
+        session = ProfileSession(mode)
+        try:
+            session.start()
+        except Exception:
+            _active.release()
+            raise
+        _local.session = session
+        logger.info(f"Profiling {request.path} ({mode}) as {session.profile_id}")
+
+    @app.after_request
+    def finish_profile(response):
+        session = current_session()
+        if session is None:
+            return response
+
+        _local.session = None
+        try:
+            try:
+                session.stop()
+            finally:
+                _active.release()
+            session.save(output_dir, request.path)
+            response.headers['X-Profile-Id'] = session.profile_id
+            response.headers['X-Profile-Peak-Bytes'] = str(session.peak_bytes)
+        except Exception as e:
+            logger.error(f"Error saving profile {session.profile_id}: {str(e)}")
+        return response
+
+    @app.teardown_request
+    def discard_profile(exc):
+        # after_request is skipped on unhandled errors; never leak an active session
+        session = current_session()
+        if session is not None:
+            _local.session = None
+            try:
+                session.stop()
+            finally:
+                _active.release()
+
+    @app.route('/api/profiles/<profile_id>')
+    def get_profile(profile_id):
+        if not enabled:
+            abort(404)
+        kind = request.args.get('kind', 'alloc')
+        extensions = {'folded': '.folded', 'cprofile': '.prof', 'alloc': '.alloc.json'}
+        if kind not in extensions:
+            return {"error": f"Invalid kind, expected one of {list(extensions)}"}, 400
+        return send_from_directory(output_dir, f"{profile_id}{extensions[kind]}", as_attachment=kind != 'alloc')
@@ -0,0 +1,244 @@
+import hashlib
+import io
+import json
+import logging
+import threading
+
+import numpy as np
+from sqlalchemy import text
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Bump when the encoded layout changes so old blobs are never misread
+PAYLOAD_FORMAT = 1
+
+LEDGER_COLUMNS = ['signal', 'entry_price', 'exit_price', 'return']
+LEDGER_DATE_COLUMNS = ['created_date', 'exit_date']
+
+
+def strategy_params(strategy_obj):
+    """Parameters that define a strategy instance, taken from its attributes"""
+    return {k: v for k, v in sorted(vars(strategy_obj).items()) if not k.startswith('_')}
+
+
+def make_result_key(strategy_obj, symbol, data_version, **extra):
+    """Content address for a backtest: same inputs always hash to the same key"""
+    identity = {
+        'format': PAYLOAD_FORMAT,
+        'strategy': type(strategy_obj).__name__,
+        'params': strategy_params(strategy_obj),
+        'symbol': symbol,
+        'data_version': data_version,
+        'extra': extra
+    }
+    return hashlib.sha256(json.dumps(identity, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def encode_result(result):
+    """Pack equity curve, trade ledger and metrics column-wise into a compressed npz blob"""
+    trades = result['trades']
+    arrays = {
+        'equity_dates': np.asarray(result['equity_dates'], dtype='datetime64[D]').astype(np.int64),
+        'equity': np.asarray(result['equity'], dtype=np.float64),
+        'metrics': np.frombuffer(json.dumps(result['metrics']).encode(), dtype=np.uint8)
+    }
+    for col in LEDGER_COLUMNS:
+        arrays[f'trade_{col}'] = np.array([t[col] for t in trades], dtype=np.float64)
+    for col in LEDGER_DATE_COLUMNS:
+        arrays[f'trade_{col}'] = np.array([t[col] for t in trades], dtype='datetime64[s]').astype(np.int64)
+
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def decode_result(payload):
+    with np.load(io.BytesIO(payload), allow_pickle=False) as data:
+        columns = {col: data[f'trade_{col}'] for col in LEDGER_COLUMNS}
+        dates = {
+            col: np.datetime_as_string(data[f'trade_{col}'].astype('datetime64[s]'), unit='s').tolist()
+            for col in LEDGER_DATE_COLUMNS
+        }
+        trades = [
+            {
+                'signal': int(columns['signal'][i]),
+                'entry_price': float(columns['entry_price'][i]),
+                'exit_price': float(columns['exit_price'][i]),
+                'return': float(columns['return'][i]),
+                'created_date': dates['created_date'][i],
+                'exit_date': dates['exit_date'][i]
+            }
+            for i in range(len(columns['signal']))
+        ]
+        return {
+            'equity_dates': np.datetime_as_string(data['equity_dates'].astype('datetime64[D]')).tolist(),
+            'equity': data['equity'].tolist(),
+            'trades': trades,
+            'metrics': json.loads(data['metrics'].tobytes().decode())
+        }
+
+
+class BacktestResultStore:
+    """Persistent, content-addressed store for backtest results in Postgres.
+
+    Entries are immutable: a key identifies the exact strategy, parameters,
+    symbol and data version, so a hit can be served without recomputing.
+    """
+
+    def __init__(self, engine, max_age_days=30, max_total_bytes=500 * 1024 * 1024,
+                 keep_versions=1, gc_every=100):
+        self.engine = engine
+        self.max_age_days = max_age_days
+        self.max_total_bytes = max_total_bytes
+        self.keep_versions = keep_versions
+        self.gc_every = gc_every
+        self.saves_since_gc = 0
+        self.lock = threading.Lock()
+
+    def ensure_schema(self):
+        with self.engine.connect() as conn:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS backtest_results (
+                    result_key CHAR(64) PRIMARY KEY,
+                    strategy VARCHAR(50) NOT NULL,
+                    params_hash CHAR(64) NOT NULL,
+                    symbol VARCHAR(10) NOT NULL,
+                    data_version VARCHAR(64) NOT NULL,
+                    payload BYTEA NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0,
+                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    last_accessed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                )
+            """))
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_backtest_results_lineage
+                ON backtest_results(strategy, params_hash, symbol, created_at)
+            """))
+            conn.commit()
+
+    def load(self, key):
+        """Return the decoded result for key, or None on a miss"""
+        try:
+            with self.engine.connect() as conn:
+                row = conn.execute(
+                    text("""
+                        UPDATE backtest_results
+                        SET hit_count = hit_count + 1, last_accessed_at = NOW()
+                        WHERE result_key = :key
+                        RETURNING payload
+                    """),
+                    {'key': key}
+                ).fetchone()
+                conn.commit()
+
+            if row is None:
+                return None
+            logger.info(f"Backtest result store hit: {key[:12]}")
+            return decode_result(bytes(row.payload))
+
+        except Exception as e:
+            # A broken cache must never break the backtest itself
+            logger.error(f"Error loading backtest result {key[:12]}: {str(e)}")
+            return None
+
+    def save(self, key, strategy_obj, symbol, data_version, result):
+        try:
+            payload = encode_result(result)
+            params_hash = hashlib.sha256(
+                json.dumps(strategy_params(strategy_obj), sort_keys=True, default=str).encode()
+            ).hexdigest()
+
+            with self.engine.connect() as conn:
+                conn.execute(
+                    text("""
+                        INSERT INTO backtest_results
+                            (result_key, strategy, params_hash, symbol, data_version, payload, size_bytes)
+                        VALUES (:key, :strategy, :params_hash, :symbol, :data_version, :payload, :size_bytes)
+                        ON CONFLICT (result_key) DO NOTHING
+                    """),
+                    {
+                        'key': key,
+                        'strategy': type(strategy_obj).__name__,
+                        'params_hash': params_hash,
+                        'symbol': symbol,
+                        'data_version': data_version,
+                        'payload': payload,
+                        'size_bytes': len(payload)
+                    }
+                )
+                conn.commit()
+            logger.info(f"Saved backtest result {key[:12]} ({len(payload)} bytes)")
+
+        except Exception as e:
+            logger.error(f"Error saving backtest result {key[:12]}: {str(e)}")
+            return
+
+        with self.lock:
+            self.saves_since_gc += 1
+            run_gc = self.saves_since_gc >= self.gc_every
+            if run_gc:
+                self.saves_since_gc = 0
+        if run_gc:
+            self.collect_garbage()
+
+    def collect_garbage(self):
+        """Apply retention policies and return the number of entries removed.
+
+        1. Keep only the newest `keep_versions` data versions per strategy/params/symbol.
+        2. Drop entries not read or written for `max_age_days`.
+        3. Evict least recently used entries until the store fits `max_total_bytes`.
+        """
+        try:
+            with self.engine.connect() as conn:
+                superseded = conn.execute(
+                    text("""
+                        DELETE FROM backtest_results
+                        WHERE result_key IN (
+                            SELECT result_key FROM (
+                                SELECT result_key, ROW_NUMBER() OVER (
+                                    PARTITION BY strategy, params_hash, symbol
+                                    ORDER BY created_at DESC
+                                ) AS version_rank
+                                FROM backtest_results
+                            ) ranked
+                            WHERE version_rank > :keep_versions
+                        )
+                    """),
+                    {'keep_versions': self.keep_versions}
+                ).rowcount
+
+                expired = conn.execute(
+                    text("""
+                        DELETE FROM backtest_results
+                        WHERE last_accessed_at < NOW() - make_interval(days => :max_age_days)
+                    """),
+                    {'max_age_days': self.max_age_days}
+                ).rowcount
+
+                evicted = conn.execute(
+                    text("""
+                        DELETE FROM backtest_results
+                        WHERE result_key IN (
+                            SELECT result_key FROM (
+                                SELECT result_key, SUM(size_bytes) OVER (
+                                    ORDER BY last_accessed_at DESC, result_key
+                                ) AS running_bytes
+                                FROM backtest_results
+                            ) sized
+                            WHERE running_bytes > :max_total_bytes
+                        )
+                    """),
+                    {'max_total_bytes': self.max_total_bytes}
+                ).rowcount
+                conn.commit()
+
+            logger.info(
+                f"Backtest result store GC: {superseded} superseded, {expired} expired, {evicted} evicted"
+            )
+            return superseded + expired + evicted
+
+        except Exception as e:
+            logger.error(f"Error collecting backtest result garbage: {str(e)}")
+            return 0
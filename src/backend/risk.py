@@ -0,0 +1,143 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+METHODS = ('bootstrap', 'monte_carlo')
+
+# Paths per worker task. Fixed (not derived from the core count) so a given
+# seed produces the same result on any machine.
+PATHS_PER_CHUNK = 2_000
+# Each chunk holds several (PATHS_PER_CHUNK, horizon) arrays, so the horizon
+# bounds per-worker memory (about 150 MB at this limit)
+MAX_HORIZON = 1_260
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn, not fork: the server process already runs threads (SSE listener,
+            # forecast batcher) and forking a threaded process can deadlock the child
+            _executor = ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                            mp_context=multiprocessing.get_context('spawn'))
+        return _executor
+
+
+def block_bootstrap_paths(returns, n_paths, horizon, block_size, rng):
+    """Resample (n_paths, horizon) returns from circular blocks of consecutive days.
+
+    Blocks keep short-range autocorrelation and volatility clustering that an
+    i.i.d. resample would destroy. Built purely with index arithmetic.
+    """
+    n_obs = len(returns)
+    n_blocks = -(-horizon // block_size)
+    starts = rng.integers(0, n_obs, size=(n_paths, n_blocks))
+    idx = (starts[:, :, np.newaxis] + np.arange(block_size)) % n_obs
+    return returns[idx.reshape(n_paths, -1)[:, :horizon]]
+
+
+def monte_carlo_paths(returns, n_paths, horizon, rng):
+    """Draw (n_paths, horizon) normal returns with the sample mean and volatility"""
+    return rng.normal(returns.mean(), returns.std(ddof=1), size=(n_paths, horizon))
+
+
+def path_metrics(paths, alpha):
+    """Total return, max drawdown, VaR and CVaR for every row of a (paths, days) array"""
+    equity = np.cumprod(1 + paths, axis=1)
+    total_return = equity[:, -1] - 1
+
+    peaks = np.maximum.accumulate(np.maximum(equity, 1.0), axis=1)
+    max_drawdown = (equity / peaks - 1).min(axis=1)
+
+    # Historical daily VaR/CVaR of each path, reported as positive losses
+    var_threshold = np.quantile(paths, alpha, axis=1)
+    tail = paths <= var_threshold[:, np.newaxis]
+    cvar = -(np.where(tail, paths, 0).sum(axis=1) / np.maximum(tail.sum(axis=1), 1))
+
+    return {
+        'total_return': total_return,
+        'max_drawdown': max_drawdown,
+        'var': -var_threshold,
+        'cvar': cvar
+    }
+
+
+def _simulate_chunk(returns, n_paths, horizon, method, block_size, alpha, seed_seq):
+    rng = np.random.default_rng(seed_seq)
+    if method == 'bootstrap':
+        paths = block_bootstrap_paths(returns, n_paths, horizon, block_size, rng)
+    else:
+        paths = monte_carlo_paths(returns, n_paths, horizon, rng)
+    return path_metrics(paths, alpha)
+
+
+def simulate_risk(returns, n_paths=10_000, horizon=None, method='bootstrap', block_size=10,
+                  confidence=0.95, seed=42, parallel_threshold=20_000):
+    """Resample a daily return series and summarize the distribution of outcomes.
+
+    Paths are generated in fixed-size chunks, each with its own child of
+    SeedSequence(seed), so results are reproducible whether the chunks run
+    in-process or across a process pool (used above parallel_threshold paths).
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    returns = returns[np.isfinite(returns)]
+    if method not in METHODS:
+        raise ValueError(f"Invalid method: {method}")
+    if len(returns) < 2:
+        raise ValueError("At least two returns are required")
+    if not 0 < confidence < 1:
+        raise ValueError("Confidence must be between 0 and 1")
+
+    horizon = horizon or len(returns)
+    if not 1 <= horizon <= MAX_HORIZON:
+        raise ValueError(f"Horizon must be between 1 and {MAX_HORIZON}")
+    block_size = max(1, min(block_size, len(returns)))
+    alpha = 1 - confidence
+
+    sizes = [PATHS_PER_CHUNK] * (n_paths // PATHS_PER_CHUNK)
+    if n_paths % PATHS_PER_CHUNK:
+        sizes.append(n_paths % PATHS_PER_CHUNK)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(returns, size, horizon, method, block_size, alpha, s) for size, s in zip(sizes, seeds)]
+
+    if n_paths >= parallel_threshold and len(tasks) > 1:
+        logger.info(f"Simulating {n_paths} paths in {len(tasks)} chunks across processes")
+        chunks = list(_get_executor().map(_simulate_chunk, *zip(*tasks)))
+    else:
+        chunks = [_simulate_chunk(*task) for task in tasks]
+
+    metrics = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+    lower, upper = 100 * alpha / 2, 100 * (1 - alpha / 2)
+
+    return {
+        'method': method,
+        'n_paths': n_paths,
+        'horizon': horizon,
+        'block_size': block_size if method == 'bootstrap' else None,
+        'confidence': confidence,
+        'seed': seed,
+        'observed': {
+            name: float(values[0])
+            for name, values in path_metrics(returns[np.newaxis, :], alpha).items()
+        },
+        'metrics': {
+            name: {
+                'mean': float(values.mean()),
+                'median': float(np.median(values)),
+                'ci_lower': float(np.percentile(values, lower)),
+                'ci_upper': float(np.percentile(values, upper))
+            }
+            for name, values in metrics.items()
+        },
+        'probability_of_loss': float((metrics['total_return'] < 0).mean())
+    }
@@ -69,7 +69,36 @@ class RSIStrategy(Strategy):
             
         except Exception as e:
             logger.error(f"Error calculating indicators: {str(e)}")
-            raise  
+            raise
+
+    def init_stream_state(self, data: pd.DataFrame) -> dict:
+        """Seed incremental indicator state from the last bar of a calculated history"""
+        delta = data['Close'].diff()
+        gain = (delta.where(delta > 0, 0)).fillna(0)
+        loss = (-delta.where(delta < 0, 0)).fillna(0)
+
+        return {
+            'close': float(data['Close'].iloc[-1]),
+            'avg_gain': float(gain.ewm(span=self.rsi_period, adjust=False).mean().iloc[-1]),
+            'avg_loss': float(loss.ewm(span=self.rsi_period, adjust=False).mean().iloc[-1])
+        }
+
+    def update_indicators(self, state: dict, close: float) -> dict:
+        """Advance RSI by one bar using the same EMA recursion as calculate_indicators"""
+        alpha = 2 / (self.rsi_period + 1)
+        delta = close - state['close']
+        daily_return = delta / state['close'] if state['close'] else 0.0
+
+        state['avg_gain'] = alpha * max(delta, 0.0) + (1 - alpha) * state['avg_gain']
+        state['avg_loss'] = alpha * max(-delta, 0.0) + (1 - alpha) * state['avg_loss']
+        state['close'] = close
+
+        rs = state['avg_gain'] / state['avg_loss'] if state['avg_loss'] != 0 else 0.0
+        rsi = 100 - (100 / (1 + rs))
+        signal = 1 if rsi < self.oversold else -1 if rsi > self.overbought else 0
+
+        return {'rsi': rsi, 'signal': signal, 'daily_return': daily_return}
+
     def calculate_returns(self, data: pd.DataFrame) -> float:
         try:
             data = self.preprocess_data(data)
@@ -162,17 +191,75 @@ class RSIStrategy(Strategy):
             logger.error(f"Error calculating metrics: {str(e)}")
             raise
 class MACDStrategy(Strategy):
+    def __init__(self):
+        # MACD parameters
+        self.fast_period = 12
+        self.slow_period = 26
+        self.signal_period = 9
+
     def get_minimum_required_data(self) -> int:
         return 40  # Need sufficient data for MACD calculation
 
+    def calculate_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Calculate MACD and signal line"""
+        try:
+            df = data.copy()
+
+            df['Daily_Return'] = df['Close'].pct_change().fillna(0)
+
+            exp1 = df['Close'].ewm(span=self.fast_period, adjust=False).mean()
+            exp2 = df['Close'].ewm(span=self.slow_period, adjust=False).mean()
+            df['MACD'] = exp1 - exp2
+            df['Signal'] = df['MACD'].ewm(span=self.signal_period, adjust=False).mean()
+
+            logger.info(f"MACD calculation completed. Range: {df['MACD'].min():.2f} to {df['MACD'].max():.2f}")
+
+            return df
+
+        except Exception as e:
+            logger.error(f"Error calculating indicators: {str(e)}")
+            raise
+
+    def init_stream_state(self, data: pd.DataFrame) -> dict:
+        """Seed incremental indicator state from the last bar of a calculated history"""
+        close = data['Close']
+        fast = close.ewm(span=self.fast_period, adjust=False).mean()
+        slow = close.ewm(span=self.slow_period, adjust=False).mean()
+        signal = (fast - slow).ewm(span=self.signal_period, adjust=False).mean()
+
+        return {
+            'close': float(close.iloc[-1]),
+            'fast_ema': float(fast.iloc[-1]),
+            'slow_ema': float(slow.iloc[-1]),
+            'signal_ema': float(signal.iloc[-1])
+        }
+
+    def update_indicators(self, state: dict, close: float) -> dict:
+        """Advance MACD by one bar using the same EMA recursion as calculate_indicators"""
+        def ema(prev, value, span):
+            alpha = 2 / (span + 1)
+            return alpha * value + (1 - alpha) * prev
+
+        daily_return = (close - state['close']) / state['close'] if state['close'] else 0.0
+
+        state['fast_ema'] = ema(state['fast_ema'], close, self.fast_period)
+        state['slow_ema'] = ema(state['slow_ema'], close, self.slow_period)
+        macd = state['fast_ema'] - state['slow_ema']
+        state['signal_ema'] = ema(state['signal_ema'], macd, self.signal_period)
+        state['close'] = close
+
+        signal = 1 if macd > state['signal_ema'] else -1 if macd < state['signal_ema'] else 0
+
+        return {'macd': macd, 'signal_line': state['signal_ema'], 'signal': signal, 'daily_return': daily_return}
+
     def calculate_returns(self, data: pd.DataFrame) -> float:
         data = self.preprocess_data(data)
         
         # Calculate MACD with error handling
-        exp1 = data['Close'].ewm(span=12, adjust=False).mean()
-        exp2 = data['Close'].ewm(span=26, adjust=False).mean()
+        exp1 = data['Close'].ewm(span=self.fast_period, adjust=False).mean()
+        exp2 = data['Close'].ewm(span=self.slow_period, adjust=False).mean()
         macd = exp1 - exp2
-        signal = macd.ewm(span=9, adjust=False).mean()
+        signal = macd.ewm(span=self.signal_period, adjust=False).mean()
         
         # Generate signals
         data['Signal'] = np.where(macd > signal, 1, -1)
@@ -0,0 +1,217 @@
+import json
+import logging
+import queue
+import select
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.offsets import BDay
+
+from strategies import RSIStrategy, MACDStrategy
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+STRATEGIES = {
+    'RSI': RSIStrategy,
+    'MACD': MACDStrategy
+}
+
+# Channel the ingest script notifies on for every newly inserted bar
+NOTIFY_CHANNEL = 'price_bars'
+
+
+class BarStream:
+    """Fan out newly arrived bars to subscribers of (symbol, strategy).
+
+    Indicator state is seeded once from the stored history and then advanced
+    bar by bar, so connected clients only ever receive the appended bar.
+    """
+
+    def __init__(self, load_history, max_queue_size=100):
+        self.load_history = load_history
+        self.max_queue_size = max_queue_size
+        self.subscribers = {}  # (symbol, strategy) -> set of queues
+        self.states = {}       # (symbol, strategy) -> (strategy_obj, state, last_date)
+        self.lock = threading.Lock()
+        self.started = False
+
+    def subscribe(self, symbol, strategy):
+        """Register a client queue, seeding indicator state on first use"""
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Invalid strategy: {strategy}")
+
+        key = (symbol, strategy)
+        client = queue.Queue(maxsize=self.max_queue_size)
+        with self.lock:
+            if key in self.states:
+                self.subscribers.setdefault(key, set()).add(client)
+                logger.info(f"Stream subscriber added for {symbol} {strategy}")
+                return client
+
+        # Load history outside the lock, then install the state (unless another
+        # subscriber got there first) and register in one step, so a concurrent
+        # unsubscribe cannot leave this client registered without state
+        seed = self._load_seed(symbol, strategy)
+        with self.lock:
+            self.states.setdefault(key, seed)
+            self.subscribers.setdefault(key, set()).add(client)
+        logger.info(f"Stream subscriber added for {symbol} {strategy}")
+        return client
+
+    def unsubscribe(self, symbol, strategy, client):
+        key = (symbol, strategy)
+        with self.lock:
+            clients = self.subscribers.get(key)
+            if clients is not None:
+                clients.discard(client)
+                if not clients:
+                    # Drop state too so a later subscriber re-seeds from fresh history
+                    del self.subscribers[key]
+                    self.states.pop(key, None)
+        logger.info(f"Stream subscriber removed for {symbol} {strategy}")
+
+    def _load_seed(self, symbol, strategy):
+        df, _ = self.load_history(symbol)
+        strategy_obj = STRATEGIES[strategy]()
+        state = strategy_obj.init_stream_state(df)
+        return strategy_obj, state, df.index[-1].date()
+
+    def publish(self, symbol, bar):
+        """Advance indicators for every strategy watching symbol and push the new point"""
+        bar_date = pd.to_datetime(bar['price_date']).date()
+        close = float(bar['close'])
+
+        with self.lock:
+            keys = [key for key in self.subscribers if key[0] == symbol]
+            for key in keys:
+                if key not in self.states:
+                    continue
+                strategy_obj, state, last_date = self.states[key]
+                if bar_date <= last_date:
+                    # Bar already part of the seeded history
+                    continue
+
+                values = strategy_obj.update_indicators(state, close)
+                self.states[key] = (strategy_obj, state, bar_date)
+
+                message = {
+                    'symbol': symbol,
+                    'strategy': key[1],
+                    'date': bar_date.isoformat(),
+                    'price': close,
+                    'signal': values.pop('signal'),
+                    'strategy_return': values.pop('daily_return'),
+                    **values
+                }
+
+                for client in list(self.subscribers[key]):
+                    try:
+                        client.put_nowait(message)
+                    except queue.Full:
+                        # Slow consumer: disconnect it rather than buffering without bound
+                        self.subscribers[key].discard(client)
+                        try:
+                            client.get_nowait()
+                        except queue.Empty:
+                            pass
+                        client.put_nowait(None)
+                        logger.warning(f"Dropping slow stream subscriber for {symbol} {key[1]}")
+
+    def start(self, engine, simulate_symbols=None, simulate_interval=5.0):
+        """Start the background bar sources once per process"""
+        with self.lock:
+            if self.started:
+                return
+            self.started = True
+
+        threading.Thread(target=listen_for_bars, args=(engine, self), daemon=True).start()
+        if simulate_symbols:
+            source = SimulatedTickSource(self, simulate_symbols, simulate_interval)
+            threading.Thread(target=source.run, daemon=True).start()
+
+
+def listen_for_bars(engine, stream):
+    """Relay Postgres NOTIFY payloads from the ingest script into the stream"""
+    while True:
+        try:
+            conn = engine.raw_connection()
+            # Keep the autocommit LISTEN connection out of the shared pool
+            conn.detach()
+            try:
+                dbapi_conn = conn.dbapi_connection
+                dbapi_conn.autocommit = True
+                cur = dbapi_conn.cursor()
+                cur.execute(f"LISTEN {NOTIFY_CHANNEL};")
+                logger.info(f"Listening for new bars on channel {NOTIFY_CHANNEL}")
+
+                while True:
+                    if select.select([dbapi_conn], [], [], 30) == ([], [], []):
+                        continue
+                    dbapi_conn.poll()
+                    while dbapi_conn.notifies:
+                        notify = dbapi_conn.notifies.pop(0)
+                        try:
+                            bar = json.loads(notify.payload)
+                            stream.publish(bar['symbol'], bar)
+                        except Exception as e:
+                            # One bad bar must not drop LISTEN and lose notifies during reconnect
+                            logger.error(f"Error publishing bar {notify.payload}: {str(e)}")
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.error(f"Bar listener error, reconnecting: {str(e)}")
+            time.sleep(5)
+
+
+class SimulatedTickSource:
+    """Random-walk bar generator for exercising the stream without live ingest"""
+
+    def __init__(self, stream, symbols, interval=5.0, volatility=0.01, seed=None):
+        self.stream = stream
+        self.symbols = symbols
+        self.interval = interval
+        self.volatility = volatility
+        self.rng = np.random.default_rng(seed)
+        self.last_bars = {}  # symbol -> (date, close)
+
+    def next_bar(self, symbol):
+        if symbol not in self.last_bars:
+            df, _ = self.stream.load_history(symbol)
+            self.last_bars[symbol] = (df.index[-1], float(df['Close'].iloc[-1]))
+
+        last_date, last_close = self.last_bars[symbol]
+        bar_date = last_date + BDay(1)
+        close = last_close * float(np.exp(self.rng.normal(0, self.volatility)))
+        self.last_bars[symbol] = (bar_date, close)
+
+        return {
+            'symbol': symbol,
+            'price_date': bar_date.strftime('%Y-%m-%d'),
+            'close': round(close, 2)
+        }
+
+    def run(self):
+        logger.info(f"Simulated ticks started for {self.symbols} every {self.interval}s")
+        while True:
+            for symbol in self.symbols:
+                try:
+                    self.stream.publish(symbol, self.next_bar(symbol))
+                except Exception as e:
+                    logger.error(f"Error simulating tick for {symbol}: {str(e)}")
+            time.sleep(self.interval)
+
+
+def format_sse(data, event=None):
+    """Encode a message as a Server-Sent Events frame"""
+    message = f"data: {json.dumps(data)}\n\n"
+    if event is not None:
+        message = f"event: {event}\n{message}"
+    return message
+
+
+def sse_heartbeat():
+    return f": keepalive {datetime.now().isoformat()}\n\n"
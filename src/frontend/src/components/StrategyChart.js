@@ -244,6 +244,45 @@ export default function StrategyChart({ symbol, strategy, startDate, endDate })
     fetchData();
   }, [symbol, strategy, startDate, endDate]);
 
+  // Subscribe to live bars so new data is appended instead of re-fetching the full series
+  useEffect(() => {
+    if (!symbol || !strategy) {
+      return undefined;
+    }
+
+    const streamUrl = new URL('http://localhost:5000/api/stream/strategy_data');
+    streamUrl.searchParams.append('symbol', symbol);
+    streamUrl.searchParams.append('strategy', strategy);
+
+    const source = new EventSource(streamUrl.toString());
+
+    source.addEventListener('bar', (event) => {
+      const bar = JSON.parse(event.data);
+      setChartData(prev => {
+        if (!prev) {
+          return prev;
+        }
+        const [price, returns, buys, sells] = prev.datasets;
+        return {
+          ...prev,
+          labels: [...prev.labels, new Date(bar.date)],
+          datasets: [
+            { ...price, data: [...price.data, bar.price] },
+            { ...returns, data: [...returns.data, bar.strategy_return] },
+            { ...buys, data: [...buys.data, bar.signal === 1 ? bar.price : null] },
+            { ...sells, data: [...sells.data, bar.signal === -1 ? bar.price : null] }
+          ]
+        };
+      });
+    });
+
+    source.onerror = (err) => {
+      console.warn('Live stream error, browser will retry:', err);
+    };
+
+    return () => source.close();
+  }, [symbol, strategy]);
+
   const options = {
     responsive: true,
     interaction: {
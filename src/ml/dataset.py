@@ -0,0 +1,172 @@
+import json
+import logging
+import random
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from sqlalchemy import text
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+FEATURES = ('close', 'return')
+NORMALIZATIONS = (None, 'window', 'symbol')
+# Written next to a saved model and checked by src/backend/forecasting.py
+SPEC_SUFFIX = '.spec.json'
+
+
+def load_series(engine, symbol, feature='close'):
+    """Load one symbol's closes (or daily returns) as a contiguous float32 array"""
+    if feature not in FEATURES:
+        raise ValueError(f"Invalid feature: {feature}")
+
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text("""
+                SELECT close_price
+                FROM prices
+                WHERE symbol = :symbol AND close_price IS NOT NULL
+                ORDER BY price_date
+            """),
+            {'symbol': symbol}
+        ).fetchall()
+
+    close = np.fromiter((row[0] for row in rows), dtype=np.float32, count=len(rows))
+    if feature == 'return':
+        return np.diff(close) / close[:-1]
+    return close
+
+
+def sliding_windows(series, window, horizon=1):
+    """Return (windows, targets) as strided views of series without copying.
+
+    windows[i] is series[i:i + window] and targets[i] is the value `horizon`
+    steps after that window ends.
+    """
+    n_windows = len(series) - window - horizon + 1
+    if n_windows <= 0:
+        empty = np.empty((0, window), dtype=series.dtype)
+        return empty, np.empty(0, dtype=series.dtype)
+
+    windows = sliding_window_view(series, window)[:n_windows]
+    targets = series[window + horizon - 1:]
+    return windows, targets
+
+
+def normalize_chunk(windows, targets, normalization):
+    """Materialize one chunk of windows, z-scored per window when requested"""
+    x = np.array(windows, dtype=np.float32)
+    y = np.array(targets, dtype=np.float32)
+
+    if normalization == 'window':
+        mean = x.mean(axis=1, keepdims=True)
+        std = x.std(axis=1, keepdims=True)
+        std[std == 0] = 1.0
+        x -= mean
+        x /= std
+        y = (y - mean[:, 0]) / std[:, 0]
+
+    return x[..., np.newaxis], y[:, np.newaxis]
+
+
+def iter_window_chunks(load, symbols, window, horizon=1, normalization='window',
+                       chunk_size=1024, cycle_length=4, seed=None):
+    """Yield (x, y) chunks interleaved round-robin across `cycle_length` symbols.
+
+    Only `cycle_length` symbol series are held at once, and each yielded chunk
+    is the only copy made of the windows it contains, so memory does not grow
+    with the number of symbols.
+
+    'symbol' normalization z-scores each series with its own full-history mean
+    and std, targets included, so it leaks future levels into every window.
+    Split validation data by symbol rather than by date when using it.
+    """
+    if normalization not in NORMALIZATIONS:
+        raise ValueError(f"Invalid normalization: {normalization}")
+
+    order = list(symbols)
+    random.Random(seed).shuffle(order)
+    pending = iter(order)
+    active = []
+
+    def open_next():
+        for symbol in pending:
+            series = load(symbol)
+            if normalization == 'symbol' and len(series):
+                std = series.std()
+                series = (series - series.mean()) / (std if std > 0 else 1.0)
+            windows, targets = sliding_windows(series, window, horizon)
+            if len(windows):
+                return [symbol, windows, targets, 0]
+            logger.warning(f"Skipping {symbol}: fewer than {window + horizon} observations")
+        return None
+
+    while len(active) < cycle_length:
+        stream = open_next()
+        if stream is None:
+            break
+        active.append(stream)
+
+    while active:
+        for stream in list(active):
+            symbol, windows, targets, pos = stream
+            end = min(pos + chunk_size, len(windows))
+            yield normalize_chunk(windows[pos:end], targets[pos:end], normalization)
+
+            if end >= len(windows):
+                active.remove(stream)
+                replacement = open_next()
+                if replacement is not None:
+                    active.append(replacement)
+            else:
+                stream[3] = end
+
+
+def make_training_dataset(load, symbols, window=30, horizon=1, normalization='window',
+                          batch_size=256, shuffle_buffer=50_000, memory_budget_bytes=None,
+                          chunk_size=1024, cycle_length=4, seed=None):
+    """Build a tf.data pipeline of (batch, window, 1) inputs and (batch, 1) targets.
+
+    Windows are streamed per symbol, shuffled within a bounded buffer, batched
+    and prefetched on CPU. When memory_budget_bytes is given the shuffle buffer
+    is capped so buffered examples fit in it.
+    """
+    import tensorflow as tf  # deferred: the windowing helpers above do not need it
+
+    if memory_budget_bytes is not None:
+        bytes_per_example = (window + 1) * np.dtype(np.float32).itemsize
+        shuffle_buffer = max(1, min(shuffle_buffer, memory_budget_bytes // bytes_per_example))
+        logger.info(f"Shuffle buffer capped at {shuffle_buffer} examples for the memory budget")
+
+    dataset = tf.data.Dataset.from_generator(
+        lambda: iter_window_chunks(load, symbols, window, horizon, normalization,
+                                   chunk_size, cycle_length, seed),
+        output_signature=(
+            tf.TensorSpec(shape=(None, window, 1), dtype=tf.float32),
+            tf.TensorSpec(shape=(None, 1), dtype=tf.float32)
+        )
+    )
+
+    with tf.device('/CPU:0'):
+        dataset = (
+            dataset
+            .unbatch()
+            .shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+            .batch(batch_size, drop_remainder=False)
+            .prefetch(tf.data.AUTOTUNE)
+        )
+    return dataset
+
+
+def save_model(model, path, window, feature, normalization, horizon=1):
+    """Save a trained model with the dataset recipe serving must reproduce"""
+    model.save(path)
+    with open(path + SPEC_SUFFIX, 'w') as f:
+        json.dump({'window': window, 'feature': feature, 'normalization': normalization, 'horizon': horizon}, f)
+
+# Usage:
+# load = lambda symbol: load_series(engine, symbol, feature='return')
+# dataset = make_training_dataset(load, symbols, window=30, memory_budget_bytes=256 * 1024**2)
+# model = build_lstm_model((30, 1))
+# model.fit(dataset, epochs=10)
+# save_model(model, 'models/lstm.keras', window=30, feature='return', normalization='window')
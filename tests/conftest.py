@@ -0,0 +1,7 @@
+import os
+import sys
+
+# scripts/, src/backend/ and src/ml/ are flat module directories run from their own folder
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in ('scripts', os.path.join('src', 'backend'), os.path.join('src', 'ml')):
+    sys.path.insert(0, os.path.join(ROOT, path))
@@ -0,0 +1,46 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bulk_import import drop_repeated_days, validate_chunk
+
+
+def make_chunk(symbols):
+    n = len(symbols)
+    return pd.DataFrame({
+        'symbol': symbols,
+        'date': ['2024-01-02'] * n,
+        'open': [1.0] * n, 'high': [1.0] * n, 'low': [1.0] * n, 'close': [1.0] * n,
+        'volume': [100] * n
+    })
+
+
+def test_missing_symbols_are_rejected():
+    stats = Counter()
+    valid = validate_chunk(make_chunk([' aapl', np.nan, None, '', 'TOOLONGSYMBOL']), stats)
+
+    assert valid['symbol'].tolist() == ['AAPL']
+    assert stats['bad_symbol'] == 4
+
+
+@pytest.mark.filterwarnings('ignore:Could not infer format')
+def test_unparseable_dates_are_counted_once():
+    chunk = make_chunk(['AAPL', None])
+    chunk.loc[:, 'date'] = ['not a date', 'not a date']
+    stats = Counter()
+
+    assert validate_chunk(chunk, stats).empty
+    assert stats['bad_date'] == 2 and stats['bad_symbol'] == 0
+
+
+def test_first_copy_of_a_repeated_day_wins():
+    rows = make_chunk(['AAPL', 'AAPL', 'MSFT'])
+    rows['date'] = pd.to_datetime(['2024-01-02 09:30', '2024-01-02 16:00', '2024-01-02 00:00'])
+    rows['close'] = [1.0, 2.0, 3.0]
+
+    kept, dropped = drop_repeated_days(rows)
+    assert dropped == 1
+    assert kept['close'].tolist() == [1.0, 3.0]
+    assert (kept['date'] == pd.Timestamp('2024-01-02')).all()
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from correlation import ResultCache, correlation_matrix, matrix_to_json, pair_indices, rolling_correlation
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(0)
+    mixing = rng.normal(size=(5, 5))
+    return rng.normal(size=(200, 5)) @ mixing * 0.01
+
+
+def test_correlation_matrix_matches_numpy(returns):
+    cov, corr = correlation_matrix(returns)
+    np.testing.assert_allclose(cov, np.cov(returns, rowvar=False))
+    np.testing.assert_allclose(corr, np.corrcoef(returns, rowvar=False))
+
+
+@pytest.mark.parametrize('step', [1, 3, 20, 45])
+def test_rolling_correlation_matches_recompute(returns, step):
+    window = 20
+    results = list(rolling_correlation(returns, window, step))
+
+    expected_ends = list(range(window - 1, len(returns), step))
+    assert [end for end, _, _ in results] == expected_ends
+    for end, cov, corr in results:
+        block = returns[end - window + 1:end + 1]
+        np.testing.assert_allclose(cov, np.cov(block, rowvar=False), atol=1e-12)
+        np.testing.assert_allclose(corr, np.corrcoef(block, rowvar=False), atol=1e-10)
+
+
+def test_rolling_correlation_constant_column_is_nan():
+    returns = np.column_stack([np.linspace(0, 1, 10), np.zeros(10)])
+    _, _, corr = next(rolling_correlation(returns, 5))
+    assert np.isnan(corr[0, 1]) and np.isnan(corr[1, 1])
+    assert matrix_to_json(corr)[1] == [None, None]
+
+
+def test_rolling_correlation_rejects_short_input():
+    with pytest.raises(ValueError):
+        next(rolling_correlation(np.zeros((3, 2)), 5))
+
+
+def test_pair_indices():
+    symbols = ['A', 'B', 'C']
+    rows, cols = pair_indices(symbols)
+    assert list(zip(rows, cols)) == [(0, 1), (0, 2), (1, 2)]
+    rows, cols = pair_indices(symbols, ['C:A'])
+    assert list(zip(rows, cols)) == [(2, 0)]
+    with pytest.raises(ValueError):
+        pair_indices(symbols, ['A:D'])
+
+
+def test_result_cache_is_bounded_by_bytes():
+    cache = ResultCache(max_entries=10, max_bytes=100)
+    cache.put('a', 'x', nbytes=60)
+    cache.put('b', 'y', nbytes=30)
+    assert cache.get('a') == 'x'  # Now most recently used
+    cache.put('c', 'z', nbytes=30)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 'x' and cache.get('c') == 'z'
+    assert cache.total_bytes == 90
+
+    cache.put('huge', 'w', nbytes=101)
+    assert cache.get('huge') is None and cache.total_bytes == 90
@@ -0,0 +1,92 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from data_quality import check_batch, flag_outliers, price_frame, reason_literals
+
+TODAY = date(2030, 1, 1)
+
+
+def make_batch(closes, volume=100.0, start='2024-01-01'):
+    close = np.asarray(closes, dtype=np.float64)
+    index = pd.date_range(start, periods=len(close), freq='B')
+    return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': volume}, index=index)
+
+
+def outliers(closes, prev_close=None):
+    return check_batch(make_batch(closes), TODAY, prev_close)['outlier_return'].tolist()
+
+
+def test_clean_batch_has_no_failures():
+    failures = check_batch(make_batch([100, 101, 99, 102]), TODAY)
+    assert not failures.to_numpy().any()
+
+
+def test_isolated_spike_flags_only_the_spike():
+    assert outliers([100, 101, 300, 102, 103]) == [False, False, True, False, False]
+
+
+def test_multi_bar_spike_that_reverts_stays_flagged():
+    assert outliers([100, 300, 310, 101]) == [False, True, True, False]
+
+
+def test_level_shift_is_accepted_once_confirmed():
+    assert outliers([100, 30, 31, 32, 33, 34]) == [False] * 6
+
+
+def test_level_shift_against_stored_close():
+    # Too short to confirm yet: both stay quarantined as pending suspects
+    assert outliers([30, 31], prev_close=100) == [True, True]
+    # Pending suspects re-checked with the next bar confirm the shift
+    assert outliers([30, 31, 32], prev_close=100) == [False, False, False]
+
+
+def test_disagreeing_suspects_restart_the_run():
+    assert outliers([100, 300, 30, 31]) == [False, True, True, True]
+
+
+def test_invalid_rows_do_not_anchor_returns():
+    batch = make_batch([100, 1000, 101])
+    batch.iloc[1, batch.columns.get_loc('Volume')] = 0
+    failures = check_batch(batch, TODAY)
+    assert failures['zero_volume'].tolist() == [False, True, False]
+    assert not failures['outlier_return'].any()
+
+
+def test_row_level_checks():
+    batch = make_batch([10, 11, 12, 13, 14], start='2029-12-27')
+    batch.iloc[0, batch.columns.get_loc('Open')] = np.nan
+    batch.iloc[1, batch.columns.get_loc('Low')] = -1
+    batch.iloc[2, batch.columns.get_loc('High')] = 5
+    batch.iloc[3, batch.columns.get_loc('Volume')] = np.nan
+    failures = check_batch(batch, TODAY)
+
+    assert failures['null_price'].tolist() == [True, False, False, False, False]
+    assert failures['non_positive_price'].tolist() == [False, True, False, False, False]
+    assert failures['ohlc_inconsistent'].tolist() == [False, False, True, False, False]
+    assert failures['zero_volume'].tolist() == [False, False, False, True, False]
+    assert failures['future_date'].tolist() == [False, False, False, False, True]
+
+
+def test_flag_outliers_without_valid_rows():
+    assert not flag_outliers(np.array([np.nan, np.nan]), np.array([False, False])).any()
+
+
+def test_reason_literals():
+    failures = check_batch(make_batch([10, 11]), TODAY)
+    failures.iloc[0, failures.columns.get_loc('zero_volume')] = True
+    failures.iloc[0, failures.columns.get_loc('outlier_return')] = True
+    assert reason_literals(failures).tolist() == ['{zero_volume,outlier_return}', '{}']
+
+
+def test_price_frame_maps_non_finite_values_to_null():
+    batch = make_batch([10, 11])
+    batch.iloc[0, batch.columns.get_loc('Open')] = np.inf
+    batch.iloc[1, batch.columns.get_loc('Volume')] = np.nan
+    frame = price_frame('AAPL', batch)
+
+    assert frame['price_date'].tolist() == ['2024-01-01', '2024-01-02']
+    assert pd.isna(frame['open_price'].iloc[0])
+    assert frame['volume'].iloc[0] == 100
+    assert pd.isna(frame['volume'].iloc[1])
@@ -0,0 +1,76 @@
+import random
+
+import numpy as np
+import pytest
+
+from dataset import iter_window_chunks, normalize_chunk, sliding_windows
+
+
+@pytest.mark.parametrize('horizon', [1, 3])
+def test_sliding_windows_are_aligned_views(horizon):
+    series = np.arange(20, dtype=np.float32)
+    windows, targets = sliding_windows(series, window=5, horizon=horizon)
+
+    assert np.shares_memory(windows, series) and np.shares_memory(targets, series)
+    assert len(windows) == len(targets) == 20 - 5 - horizon + 1
+    for i in range(len(windows)):
+        np.testing.assert_array_equal(windows[i], series[i:i + 5])
+        assert targets[i] == series[i + 5 + horizon - 1]
+
+
+def test_sliding_windows_short_series_is_empty():
+    windows, targets = sliding_windows(np.arange(4, dtype=np.float32), window=3, horizon=2)
+    assert windows.shape == (0, 3) and targets.shape == (0,)
+
+
+def test_normalize_chunk_window_inverts():
+    series = np.random.default_rng(0).normal(100, 5, size=40).astype(np.float32)
+    series[10:20] = 7.0  # a flat window must not divide by zero
+    windows, targets = sliding_windows(series, window=10, horizon=2)
+    x, y = normalize_chunk(windows, targets, 'window')
+
+    assert x.shape == (len(windows), 10, 1) and y.shape == (len(windows), 1)
+    assert not np.shares_memory(x, series)
+
+    mean = windows.mean(axis=1, keepdims=True)
+    std = windows.std(axis=1, keepdims=True)
+    std[std == 0] = 1.0
+    np.testing.assert_allclose(x[..., 0] * std + mean, windows, rtol=1e-5)
+    np.testing.assert_allclose(y[:, 0] * std[:, 0] + mean[:, 0], targets, rtol=1e-5)
+
+
+def test_normalize_chunk_none_copies_unchanged():
+    series = np.arange(12, dtype=np.float32)
+    windows, targets = sliding_windows(series, window=4)
+    x, y = normalize_chunk(windows, targets, None)
+    np.testing.assert_array_equal(x[..., 0], windows)
+    np.testing.assert_array_equal(y[:, 0], targets)
+
+
+def test_iter_window_chunks_round_robin():
+    seed = 3
+    symbols = ['A', 'B', 'C', 'D', 'E']
+    order = list(symbols)
+    random.Random(seed).shuffle(order)
+    # Window 2, chunk 2: lengths 8, 4, 6, 4 give 3, 1, 2, 1 chunks; length 2 has no windows
+    lengths = dict(zip(order, [8, 4, 2, 6, 4]))
+    offsets = {symbol: 1000 * i for i, symbol in enumerate(order)}
+    series = {s: offsets[s] + np.arange(lengths[s], dtype=np.float32) for s in order}
+
+    chunks = list(iter_window_chunks(series.__getitem__, symbols, window=2, normalization=None,
+                                     chunk_size=2, cycle_length=2, seed=seed))
+    sources = [order[int(x[0, 0, 0]) // 1000] for x, _ in chunks]
+
+    # The first finished stream (order[1]) is replaced by order[3] once order[2] is skipped
+    a, b, _, c, d = order
+    assert sources == [a, b, a, c, a, c, d]
+
+    for symbol in (a, c):
+        x = np.concatenate([x for (x, _), s in zip(chunks, sources) if s == symbol])
+        expected, _ = sliding_windows(series[symbol], 2)
+        np.testing.assert_array_equal(x[..., 0], expected)
+
+
+def test_iter_window_chunks_rejects_unknown_normalization():
+    with pytest.raises(ValueError):
+        next(iter_window_chunks(lambda s: np.arange(10.0), ['A'], window=2, normalization='global'))
@@ -0,0 +1,78 @@
+from datetime import date
+
+import numpy as np
+
+from gap_index import STORED_DATES, find_missing_ranges, last_stored_dates, plan_backfill, provider_range, refresh_gap_index
+from trading_calendar import trading_sessions
+
+
+def days(*values):
+    return np.array(values, dtype='datetime64[D]')
+
+
+def test_find_missing_ranges_groups_consecutive_sessions():
+    sessions = trading_sessions('stock', date(2024, 1, 2), date(2024, 1, 12))
+    stored = np.setdiff1d(sessions, days('2024-01-04', '2024-01-05', '2024-01-08', '2024-01-11'))
+
+    assert find_missing_ranges(stored, sessions) == [
+        (date(2024, 1, 4), date(2024, 1, 8), 3),
+        (date(2024, 1, 11), date(2024, 1, 11), 1),
+    ]
+
+
+def test_find_missing_ranges_ignores_weekends_and_holidays():
+    sessions = trading_sessions('stock', date(2024, 3, 27), date(2024, 4, 2))
+    assert find_missing_ranges(sessions.copy(), sessions) == []
+
+
+def test_plan_backfill_bridges_nearby_gaps():
+    sessions = trading_sessions('stock', date(2024, 1, 2), date(2024, 3, 28))
+    gaps = [
+        (date(2024, 1, 4), date(2024, 1, 5)),
+        (date(2024, 1, 9), date(2024, 1, 9)),   # 1 present session after the first gap
+        (date(2024, 3, 1), date(2024, 3, 4)),   # far away: separate request
+    ]
+
+    assert plan_backfill(gaps, sessions, max_bridge_sessions=5) == [
+        (date(2024, 1, 4), date(2024, 1, 9)),
+        (date(2024, 3, 1), date(2024, 3, 4)),
+    ]
+    assert plan_backfill(gaps, sessions, max_bridge_sessions=0) == gaps
+
+
+def test_plan_backfill_empty():
+    assert plan_backfill([], []) == []
+
+
+def test_provider_range_end_is_exclusive():
+    assert provider_range(date(2024, 1, 4), date(2024, 1, 9)) == (date(2024, 1, 4), date(2024, 1, 10))
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    def execute(self, query, params=None):
+        self.executed.append((query, params))
+
+    def fetchall(self):
+        return self.rows
+
+
+def test_refresh_gap_index_ignores_dates_after_today():
+    sessions = trading_sessions('stock', date(2024, 1, 2), date(2024, 1, 12))
+    # A future-dated row must not extend the history into sessions that have not happened
+    stored = list(sessions.astype(object)) + [date(2024, 3, 1)]
+    cur = FakeCursor([('AAPL', 'stock', stored)])
+
+    assert refresh_gap_index(cur, ['AAPL'], today=date(2024, 1, 12)) == {'AAPL': 0}
+    assert cur.executed[-1][0].strip().startswith('DELETE FROM price_gaps')
+    assert cur.executed[-1][1] == ('AAPL', [])
+
+
+def test_future_dated_quarantine_rows_are_not_stored_dates():
+    assert "'future_date' = ANY(reasons)" in STORED_DATES
+    cur = FakeCursor([('AAPL', date(2024, 1, 12))])
+    assert last_stored_dates(cur) == {'AAPL': date(2024, 1, 12)}
+    assert STORED_DATES in cur.executed[0][0]
@@ -0,0 +1,41 @@
+from result_store import decode_result, encode_result, make_result_key
+from strategies import MACDStrategy, RSIStrategy
+
+
+def make_result():
+    return {
+        'equity_dates': ['2024-01-02', '2024-01-03', '2024-01-04'],
+        'equity': [1.0, 1.0125, 0.99875],
+        'trades': [
+            {'signal': 1, 'entry_price': 101.25, 'exit_price': 103.5, 'return': 0.0222222,
+             'created_date': '2024-01-02T00:00:00', 'exit_date': '2024-01-03T00:00:00'},
+            {'signal': -1, 'entry_price': 103.5, 'exit_price': 102.0, 'return': 0.0144928,
+             'created_date': '2024-01-03T00:00:00', 'exit_date': '2024-01-04T00:00:00'},
+        ],
+        'metrics': {'total_return': -0.00125, 'sharpe_ratio': None, 'num_trades': 2}
+    }
+
+
+def test_encode_decode_round_trip():
+    result = make_result()
+    assert decode_result(encode_result(result)) == result
+
+
+def test_round_trip_without_trades():
+    result = dict(make_result(), trades=[])
+    assert decode_result(encode_result(result)) == result
+
+
+def test_result_key_is_deterministic():
+    assert make_result_key(RSIStrategy(), 'AAPL', 'v1', days=252) == make_result_key(RSIStrategy(), 'AAPL', 'v1', days=252)
+
+
+def test_result_key_changes_with_inputs():
+    base = make_result_key(RSIStrategy(), 'AAPL', 'v1')
+    assert make_result_key(RSIStrategy(), 'MSFT', 'v1') != base
+    assert make_result_key(RSIStrategy(), 'AAPL', 'v2') != base
+    assert make_result_key(MACDStrategy(), 'AAPL', 'v1') != base
+
+    tuned = RSIStrategy()
+    tuned.rsi_period = 21
+    assert make_result_key(tuned, 'AAPL', 'v1') != base
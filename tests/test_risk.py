@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from risk import MAX_HORIZON, PATHS_PER_CHUNK, block_bootstrap_paths, path_metrics, simulate_risk
+
+
+def test_block_bootstrap_paths_are_circular_blocks():
+    returns = np.arange(10, dtype=np.float64)
+    paths = block_bootstrap_paths(returns, n_paths=50, horizon=23, block_size=5,
+                                  rng=np.random.default_rng(1))
+
+    assert paths.shape == (50, 23)
+    starts = np.random.default_rng(1).integers(0, 10, size=(50, 5))
+    for b in range(5):
+        block = paths[:, b * 5:(b + 1) * 5]
+        np.testing.assert_array_equal(block[:, 0], starts[:, b])
+        # Consecutive days within a block, wrapping past the end of the series
+        assert (np.diff(block, axis=1) % 10 == 1).all()
+
+
+def test_simulate_risk_same_seed_parallel_and_serial():
+    returns = np.random.default_rng(0).normal(0.0005, 0.01, size=250)
+    n_paths = 2 * PATHS_PER_CHUNK + 500
+
+    serial = simulate_risk(returns, n_paths=n_paths, horizon=20, seed=7, parallel_threshold=10 ** 9)
+    parallel = simulate_risk(returns, n_paths=n_paths, horizon=20, seed=7, parallel_threshold=1)
+    other = simulate_risk(returns, n_paths=n_paths, horizon=20, seed=8, parallel_threshold=10 ** 9)
+
+    assert serial == parallel
+    assert serial['metrics'] != other['metrics']
+
+
+def test_path_metrics_hand_checked():
+    paths = np.array([
+        [0.1, -0.5, 0.2, 0.0],
+        [-0.1, 0.05, 0.0, 0.0],
+    ])
+    metrics = path_metrics(paths, alpha=0.25)
+
+    # Equity 1.1, 0.55, 0.66, 0.66 and 0.9, 0.945, 0.945, 0.945
+    np.testing.assert_allclose(metrics['total_return'], [-0.34, -0.055])
+    # Drawdowns are measured from the starting capital as well as later peaks
+    np.testing.assert_allclose(metrics['max_drawdown'], [-0.5, -0.1])
+    # 25% quantile interpolates between the two lowest days
+    np.testing.assert_allclose(metrics['var'], [0.125, 0.025])
+    np.testing.assert_allclose(metrics['cvar'], [0.5, 0.1])
+
+
+def test_simulate_risk_rejects_long_horizon():
+    returns = np.random.default_rng(0).normal(0, 0.01, size=100)
+    with pytest.raises(ValueError, match='Horizon'):
+        simulate_risk(returns, n_paths=100, horizon=MAX_HORIZON + 1)
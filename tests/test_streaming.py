@@ -0,0 +1,89 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from streaming import BarStream
+
+
+def load_history(symbol):
+    index = pd.bdate_range('2024-01-01', periods=60)
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, len(index)))
+    return pd.DataFrame({'Close': close}, index=index), None
+
+
+def bar(date, close=101.0):
+    return {'symbol': 'AAPL', 'price_date': date, 'close': close}
+
+
+def test_subscriber_receives_only_new_bars():
+    stream = BarStream(load_history)
+    client = stream.subscribe('AAPL', 'RSI')
+
+    stream.publish('AAPL', bar('2024-03-01'))  # Inside the seeded history
+    stream.publish('AAPL', bar('2024-03-29'))
+
+    message = client.get_nowait()
+    assert message['date'] == '2024-03-29' and message['strategy'] == 'RSI'
+    assert client.empty()
+
+
+def test_publish_skips_subscribers_without_state():
+    stream = BarStream(load_history)
+    client = stream.subscribe('AAPL', 'MACD')
+    stream.states.clear()
+
+    stream.publish('AAPL', bar('2024-03-29'))
+    assert client.empty()
+
+
+class InterleavingLock:
+    """Lock that runs a callback right after its next release"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.after_release = None
+
+    def __enter__(self):
+        self.lock.acquire()
+
+    def __exit__(self, *exc):
+        self.lock.release()
+        callback, self.after_release = self.after_release, None
+        if callback is not None:
+            callback()
+
+
+def test_last_subscriber_leaving_mid_subscribe_keeps_state():
+    stream = BarStream(load_history)
+    first = stream.subscribe('AAPL', 'RSI')
+
+    # The only other subscriber leaves as soon as the new one releases the lock
+    stream.lock = InterleavingLock()
+    stream.lock.after_release = lambda: stream.unsubscribe('AAPL', 'RSI', first)
+    second = stream.subscribe('AAPL', 'RSI')
+
+    stream.publish('AAPL', bar('2024-03-29'))
+    assert second.get_nowait()['date'] == '2024-03-29'
+
+
+def test_concurrent_subscribe_and_unsubscribe_never_break_publish():
+    stream = BarStream(load_history)
+    errors = []
+
+    def churn():
+        try:
+            for _ in range(200):
+                stream.unsubscribe('AAPL', 'RSI', stream.subscribe('AAPL', 'RSI'))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=churn) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for day in pd.bdate_range('2024-03-29', periods=200):
+        stream.publish('AAPL', bar(day.strftime('%Y-%m-%d')))
+    for thread in threads:
+        thread.join()
+
+    assert not errors
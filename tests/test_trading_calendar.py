@@ -0,0 +1,52 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from trading_calendar import trading_sessions
+
+
+def sessions(start, end, market='stock'):
+    return set(trading_sessions(market, start, end).astype(object))
+
+
+@pytest.mark.parametrize('year, expected', [(2021, 252), (2022, 251), (2023, 250), (2024, 252)])
+def test_nyse_session_counts(year, expected):
+    assert len(trading_sessions('stock', date(year, 1, 1), date(year, 12, 31))) == expected
+
+
+@pytest.mark.parametrize('holiday', [
+    date(2024, 1, 1),    # New Year's Day
+    date(2024, 1, 15),   # Martin Luther King Jr. Day
+    date(2024, 2, 19),   # Presidents Day
+    date(2024, 3, 29),   # Good Friday
+    date(2024, 5, 27),   # Memorial Day
+    date(2024, 6, 19),   # Juneteenth
+    date(2024, 7, 4),    # Independence Day
+    date(2024, 9, 2),    # Labor Day
+    date(2024, 11, 28),  # Thanksgiving
+    date(2024, 12, 25),  # Christmas
+    date(2023, 1, 2),    # New Year's Day on a Sunday, observed Monday
+    date(2022, 6, 20),   # Juneteenth on a Sunday, observed Monday
+    date(2021, 12, 24),  # Christmas on a Saturday, observed Friday
+    date(2001, 9, 11),   # Special closure
+    date(2012, 10, 29),  # Hurricane Sandy
+    date(2025, 1, 9),    # Carter funeral
+])
+def test_holidays_and_closures_are_not_sessions(holiday):
+    assert holiday not in sessions(holiday, holiday)
+
+
+def test_saturday_new_year_is_not_observed_on_friday():
+    # 2022-01-01 was a Saturday; NYSE stayed open on 2021-12-31
+    assert date(2021, 12, 31) in sessions(date(2021, 12, 31), date(2021, 12, 31))
+
+
+def test_juneteenth_only_from_2022():
+    assert date(2021, 6, 18) in sessions(date(2021, 6, 18), date(2021, 6, 18))
+
+
+def test_crypto_trades_every_day():
+    result = trading_sessions('crypto', date(2024, 1, 1), date(2024, 1, 31))
+    assert len(result) == 31
+    assert result.dtype == np.dtype('datetime64[D]')